@@ -1,3 +1,7 @@
-from .adaptor_request import SanicDjangoAdaptorRequest, SanicDjangoAdaptorResponse, SanicDjangoAdaptorStreamingResponse
+from .adaptor_request import SanicDjangoAdaptorRequest, SanicDjangoAdaptorFastRequest, SanicDjangoAdaptorResponse, \
+    SanicDjangoAdaptorStreamingResponse
 from .sanic_application import get_sanic_application, SanicHandler
+from .background import BackgroundTaskRunner, BackgroundQueueFull, run_after_response
+from .fastpath import fast_path
+from .dispatch import offload_receiver
 from .version import __version__
@@ -1,5 +1,6 @@
 import cgi
 import warnings
+from inspect import isawaitable
 
 try:
     import django
@@ -146,6 +147,8 @@ class SanicDjangoAdaptorRequest(DjangoHttpRequest):
         self._body = sanic_request.body
         self._read_started = False
         self.resolver_match = None
+        # Work queued with run_after_response(), run by the handler once the response is written.
+        self.background_tasks = []
 
     def _get_scheme(self):
         return self.sanic_request.scheme
@@ -190,15 +193,54 @@ class SanicDjangoAdaptorRequest(DjangoHttpRequest):
     REQUEST = property(_get_request)
 
 
+class SanicDjangoAdaptorFastRequest(SanicDjangoAdaptorRequest):
+    """
+    A cheaper request for fast-path views. The META dict is only built if
+    something reads it.
+    """
+
+    def __init__(self, sanic_request):
+        """
+        :param SanicRequest sanic_request:
+        """
+        path_info = sanic_request.path or '/'
+        self.sanic_request = sanic_request
+        self.path_info = path_info
+        self.path = path_info
+        self.method = str(sanic_request.method).upper()
+        self._post_parse_error = False
+        self._body = sanic_request.body
+        self._read_started = False
+        self.resolver_match = None
+        self.background_tasks = []
+
+    @cached_property
+    def META(self):
+        meta = {"HTTP_{:s}".format(str(k).upper()): v for (k, v) in self.sanic_request.headers.items()}
+        meta['REMOTE_ADDR'] = self.sanic_request.ip[0]
+        meta['PATH_INFO'] = self.path_info
+        meta['SCRIPT_NAME'] = "/"
+        return meta
+
+
+def _response_headers(django_response):
+    """Read a Django response's headers, through the public API where Django has one."""
+    headers = getattr(django_response, 'headers', None)  # Django >= 3.2
+    if headers is not None:
+        return dict(headers)
+    return dict(django_response._headers.values())
+
+
 class SanicDjangoAdaptorResponse(SanicHttpResponse):
 
     def __init__(self, django_response):
         """
         :param DjangoHttpResponse django_response: 
         """
+        # For the usual single-chunk response, content is the view's bytes object itself, not a copy.
         body_bytes = django_response.content
         status = django_response.status_code
-        headers = dict([h for h in django_response._headers.values()])
+        headers = _response_headers(django_response)
         # content-type is None here because Content-Type is set in the headers
         # in the djanog_response.
         super(SanicDjangoAdaptorResponse, self).__init__(body=None, status=status, headers=headers,
@@ -214,14 +256,26 @@ class SanicDjangoAdaptorStreamingResponse(SanicStreamingResponse):
         :param DjangoStreamingResponse django_response: 
         """
         status = django_response.status_code
-        headers = dict([h for h in django_response._headers.values()])
-        def _streaming_fn(response):
+        headers = _response_headers(django_response)
+        async def _streaming_fn(response):
             nonlocal django_response
-            _ = {response.write(c) for c in django_response.streaming_content}
+            if getattr(django_response, 'is_async', False):  # Django >= 4.2 async iterator content
+                async for c in django_response.streaming_content:
+                    response.bytes_written += len(c)
+                    w = response.write(c)
+                    if isawaitable(w):
+                        await w
+            else:
+                for c in django_response.streaming_content:
+                    response.bytes_written += len(c)
+                    w = response.write(c)
+                    if isawaitable(w):
+                        await w
         # content-type is None here because Content-Type is set in the headers
         # in the djanog_response.
         super(SanicDjangoAdaptorStreamingResponse, self).__init__(streaming_fn=_streaming_fn,
             status=status, headers=headers, content_type=None)
+        # Body bytes handed to the transport so far, for the response size metric.
+        self.bytes_written = 0
         # These cookies are not already present in django_response headers. add them.
         _ = {self.cookies.__setitem__(morsel.key, morsel.value) for morsel in django_response.cookies.values()}
-
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from inspect import isawaitable, iscoroutinefunction
+
+logger = logging.getLogger('django.request')
+
+
+class BackgroundQueueFull(Exception):
+    """Raised when a worker already has its maximum number of pending background tasks."""
+    pass
+
+
+class BackgroundTask(object):
+    __slots__ = ('fn', 'args', 'kwargs', 'in_executor', 'retries', 'attempt')
+
+    def __init__(self, fn, args, kwargs, in_executor, retries):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.in_executor = in_executor
+        self.retries = retries
+        self.attempt = 0
+
+    def __repr__(self):
+        return "<BackgroundTask {!r} attempt={:d}>".format(self.fn, self.attempt)
+
+
+class BackgroundTaskRunner(object):
+    """
+    Runs work scheduled by a view after its response has been written.
+
+    Coroutine functions (and coroutine objects) run on the event loop. Plain
+    callables run on the loop too, unless `in_executor` is set, in which case
+    they run on a bounded thread pool so they cannot block the loop.
+    There is one runner per worker process.
+    """
+
+    def __init__(self, max_pending=1000, max_workers=4, retries=0, retry_delay=0.0, on_retry=None, on_error=None):
+        """
+        :param int max_pending: Maximum number of tasks queued or running in this worker.
+        :param int max_workers: Size of the thread pool used for executor tasks.
+        :param int retries: Default number of times a failed task is retried.
+        :param float retry_delay: Seconds to wait before each retry.
+        :param on_retry: Callable `(task, exc)` invoked before a failed task is retried.
+        :param on_error: Callable `(task, exc)` invoked when a task fails for the last time.
+        """
+        self.max_pending = max_pending
+        self.max_workers = max_workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.on_retry = on_retry
+        self.on_error = on_error
+        self._executor = None
+        self._pending = set()
+        self._loop = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(max_pending=getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_MAX_PENDING', 1000),
+                   max_workers=getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_MAX_WORKERS', 4),
+                   retries=getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_RETRIES', 0),
+                   retry_delay=getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_RETRY_DELAY', 0.0),
+                   on_retry=_hook(getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_ON_RETRY', None)),
+                   on_error=_hook(getattr(settings, 'SANIC_ADAPTOR_BACKGROUND_ON_ERROR', None)))
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def make_task(self, fn, args=(), kwargs=None, in_executor=False, retries=None):
+        if in_executor and (iscoroutinefunction(fn) or isawaitable(fn)):
+            raise ValueError("Only synchronous callables can be run in the executor.")
+        if isawaitable(fn):
+            if retries:
+                raise ValueError("A coroutine object cannot be retried, schedule the coroutine function instead.")
+            # A coroutine can only be awaited once, so the runner's default retries never apply to it.
+            retries = 0
+        return BackgroundTask(fn, args, kwargs or {}, in_executor, self.retries if retries is None else retries)
+
+    def schedule(self, fn, *args, in_executor=False, retries=None, **kwargs):
+        """
+        Schedule `fn(*args, **kwargs)` to run now, in the background.
+
+        :param fn: A coroutine function, a coroutine object or a plain callable.
+        :param bool in_executor: Run a plain callable on the thread pool instead of the loop.
+        :param int retries: Override the runner's default retry count for this task.
+        :return: The asyncio future for the task.
+        """
+        return self.submit(self.make_task(fn, args, kwargs, in_executor, retries))
+
+    def submit(self, task):
+        if len(self._pending) >= self.max_pending:
+            if isawaitable(task.fn):
+                task.fn.close()  # Avoid a "coroutine was never awaited" warning.
+            raise BackgroundQueueFull("{:d} background tasks are already pending.".format(len(self._pending)))
+        if self._loop is None:
+            self._loop = asyncio.get_event_loop()
+        future = asyncio.ensure_future(self._run(task), loop=self._loop)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    async def _run(self, task):
+        while True:
+            task.attempt += 1
+            try:
+                if isawaitable(task.fn):
+                    return await task.fn
+                if task.in_executor:
+                    return await self._loop.run_in_executor(self.executor, _call, task)
+                result = task.fn(*task.args, **task.kwargs)
+                if isawaitable(result):
+                    result = await result
+                return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if task.attempt <= task.retries:
+                    logger.warning('Background task %r failed, retrying', task, exc_info=True)
+                    if self.on_retry is not None:
+                        self.on_retry(task, e)
+                    if self.retry_delay:
+                        await asyncio.sleep(self.retry_delay)
+                    continue
+                logger.exception('Background task %r failed', task)
+                if self.on_error is not None:
+                    self.on_error(task, e)
+                return None
+
+    async def drain(self, timeout=None):
+        """
+        Wait for pending background tasks to finish. Tasks still running
+        after `timeout` seconds are cancelled.
+
+        :return: The number of tasks which were cancelled.
+        """
+        cancelled = 0
+        if self._pending:
+            done, not_done = await asyncio.wait(list(self._pending), timeout=timeout)
+            for future in not_done:
+                future.cancel()
+                cancelled += 1
+            if cancelled:
+                logger.warning('Cancelled %d background tasks which did not finish during drain.', cancelled)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return cancelled
+
+
+def _hook(hook):
+    """Resolve a hook setting, either a callable or its dotted path."""
+    if isinstance(hook, str):
+        from django.utils.module_loading import import_string
+        return import_string(hook)
+    return hook
+
+
+def _call(task):
+    return task.fn(*task.args, **task.kwargs)
+
+
+def run_after_response(request, fn, *args, in_executor=False, retries=None, **kwargs):
+    """
+    Schedule `fn(*args, **kwargs)` to run once the response to `request` has
+    been written to the client. The work is dropped if the view raises, runs
+    past its deadline or returns a 5xx response, as any database changes it
+    depended on may have been rolled back.
+
+    :param request: The Django request passed to the view.
+    :param fn: A coroutine function, a coroutine object or a plain callable.
+    :param bool in_executor: Run a plain callable on the background thread pool.
+    :param int retries: Override the default retry count for this task.
+    """
+    runner = request.sanic_request.app.handle_request.background
+    task = runner.make_task(fn, args, kwargs, in_executor, retries)
+    request.background_tasks.append(task)
+    return task
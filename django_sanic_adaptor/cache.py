@@ -0,0 +1,347 @@
+"""
+A Django cache backend shared by all the Sanic workers on a host.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_sanic_adaptor.cache.SharedMemoryCache',
+            'LOCATION': '/dev/shm/django-sanic-cache',
+            'OPTIONS': {'SLOTS': 8192, 'SLOT_SIZE': 4096},
+        }
+    }
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+
+MAGIC = b'DSACACHE'
+# magic, layout version, number of slots, slot size, slots per set
+FILE_HEADER = struct.Struct('<8sIIII')
+FILE_HEADER_SIZE = 64
+LAYOUT_VERSION = 1
+# sequence number, key hash, expiry (-1 for never), last used, key length, value length
+SLOT_HEADER = struct.Struct('<QQddII')
+SEQUENCE = struct.Struct('<Q')
+LAST_USED = struct.Struct('<d')
+LAST_USED_OFFSET = 24
+# Attempts at a lock-free read before falling back to taking the set's lock.
+READ_ATTEMPTS = 4
+THREAD_LOCK_STRIPES = 64
+
+
+class _SharedFile(object):
+    """
+    One process's mapping of a cache file. Django makes a cache backend per
+    thread, so the mapping and its thread locks are shared by all the
+    backends in the process using that file: fcntl locks are held by the
+    process, and alone they do not keep two of its threads apart.
+    """
+
+    def __init__(self, path, header, size):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX, FILE_HEADER_SIZE, 0)
+            try:
+                current_size = os.fstat(fd).st_size
+                if not current_size:
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, header, 0)
+                elif os.pread(fd, FILE_HEADER.size, 0) != header or current_size != size:
+                    # Other processes may have the file mapped, resizing it under them would crash them.
+                    raise _layout_mismatch(path)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, FILE_HEADER_SIZE, 0)
+            self.mmap = mmap.mmap(fd, size)
+        except Exception:
+            os.close(fd)
+            raise
+        self.fd = fd
+        self.header = header
+        self.pid = os.getpid()
+        self.thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+
+    def close(self):
+        self.mmap.close()
+        os.close(self.fd)
+
+
+# Cache file path: its _SharedFile in this process.
+_shared_files = {}
+_shared_files_lock = threading.Lock()
+
+
+def _layout_mismatch(path):
+    return ImproperlyConfigured(
+        "The cache file {:s} is laid out for different cache OPTIONS. Stop every process "
+        "using it and delete it, or point LOCATION at another file.".format(path))
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    Stores cache entries in a memory-mapped file, so every worker process on
+    the host shares one warm cache.
+
+    The file is a fixed slab of equal-sized slots, grouped into small sets.
+    A key hashes to a single set and can be stored in any slot of that set.
+    When a set is full, its least recently used entry is evicted. Entries too
+    big for a slot are not cached.
+
+    Writers lock only the set they write to, with a byte-range file lock
+    across processes and a striped thread lock within a process. Readers take
+    no locks. Each slot carries a sequence number which is odd while a write
+    is in progress, and a reader retries if the sequence changed under it.
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super(SharedMemoryCache, self).__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = os.path.abspath(location)
+        self._slot_size = int(options.get('SLOT_SIZE', 4096))
+        self._ways = int(options.get('SET_SIZE', 8))
+        self._sets = max(1, int(options.get('SLOTS', 8192)) // self._ways)
+        if self._slot_size <= SLOT_HEADER.size:
+            raise ValueError("SLOT_SIZE must be larger than {:d} bytes.".format(SLOT_HEADER.size))
+        self._set_size = self._slot_size * self._ways
+        self._size = FILE_HEADER_SIZE + self._set_size * self._sets
+        self._header = FILE_HEADER.pack(MAGIC, LAYOUT_VERSION, self._sets * self._ways, self._slot_size, self._ways)
+        self._shared = None
+
+    # -------------------------------------------- #
+    # Shared memory file
+    # -------------------------------------------- #
+
+    def _file(self):
+        """This process's mapping of the cache file, creating the file if needed."""
+        shared = self._shared
+        if shared is not None and shared.pid == os.getpid():
+            return shared
+        with _shared_files_lock:
+            shared = _shared_files.get(self._path)
+            if shared is None or shared.pid != os.getpid():
+                if shared is not None:
+                    # Inherited from the parent process, which keeps its own copy.
+                    shared.close()
+                    del _shared_files[self._path]
+                shared = _shared_files[self._path] = _SharedFile(self._path, self._header, self._size)
+            elif shared.header != self._header:
+                raise _layout_mismatch(self._path)
+        self._shared = shared
+        return shared
+
+    def _map(self):
+        return self._file().mmap
+
+    def _hash(self, key):
+        key_hash = struct.unpack_from('<Q', hashlib.sha1(key).digest())[0] or 1  # 0 marks an empty slot.
+        return key_hash, FILE_HEADER_SIZE + (key_hash % self._sets) * self._set_size
+
+    @contextmanager
+    def _locked(self, set_offset):
+        shared = self._file()
+        with shared.thread_locks[(set_offset // self._set_size) % THREAD_LOCK_STRIPES]:
+            fcntl.lockf(shared.fd, fcntl.LOCK_EX, self._set_size, set_offset)
+            try:
+                yield shared.mmap
+            finally:
+                fcntl.lockf(shared.fd, fcntl.LOCK_UN, self._set_size, set_offset)
+
+    # -------------------------------------------- #
+    # Slots
+    # -------------------------------------------- #
+
+    def _read(self, key, now):
+        """Lock-free lookup of the pickled value stored under `key`, or None."""
+        mm = self._map()
+        key_hash, set_offset = self._hash(key)
+        for _ in range(READ_ATTEMPTS):
+            torn = False
+            for offset in range(set_offset, set_offset + self._set_size, self._slot_size):
+                seq, slot_hash, expiry, _, key_len, value_len = SLOT_HEADER.unpack_from(mm, offset)
+                if slot_hash != key_hash or key_len != len(key):
+                    continue
+                if seq & 1:
+                    torn = True
+                    break
+                start = offset + SLOT_HEADER.size
+                data = mm[start:start + key_len + value_len]
+                if SEQUENCE.unpack_from(mm, offset)[0] != seq:
+                    torn = True
+                    break
+                if data[:key_len] != key:
+                    continue
+                if 0 <= expiry <= now:
+                    return None
+                LAST_USED.pack_into(mm, offset + LAST_USED_OFFSET, now)
+                return data[key_len:]
+            if not torn:
+                return None
+        # Lost the race against writers too often, read under the lock instead.
+        with self._locked(set_offset) as mm:
+            offset = self._find(mm, key, key_hash, set_offset, now)
+            if offset is None:
+                return None
+            _, _, _, _, key_len, value_len = SLOT_HEADER.unpack_from(mm, offset)
+            start = offset + SLOT_HEADER.size + key_len
+            return mm[start:start + value_len]
+
+    def _find(self, mm, key, key_hash, set_offset, now):
+        """Return the offset of the live slot holding `key`. The set must be locked."""
+        for offset in range(set_offset, set_offset + self._set_size, self._slot_size):
+            _, slot_hash, expiry, _, key_len, _ = SLOT_HEADER.unpack_from(mm, offset)
+            if slot_hash != key_hash or key_len != len(key):
+                continue
+            start = offset + SLOT_HEADER.size
+            if mm[start:start + key_len] != key:
+                continue
+            if 0 <= expiry <= now:
+                return None
+            return offset
+        return None
+
+    def _victim(self, mm, key, key_hash, set_offset, now):
+        """Pick the slot to write `key` into: its own, an empty or expired one, or the least recently used."""
+        victim = None
+        oldest = None
+        for offset in range(set_offset, set_offset + self._set_size, self._slot_size):
+            _, slot_hash, expiry, last_used, key_len, _ = SLOT_HEADER.unpack_from(mm, offset)
+            if slot_hash == key_hash and key_len == len(key):
+                start = offset + SLOT_HEADER.size
+                if mm[start:start + key_len] == key:
+                    return offset
+            if slot_hash == 0 or 0 <= expiry <= now:
+                last_used = -1.0
+            if oldest is None or last_used < oldest:
+                victim, oldest = offset, last_used
+        return victim
+
+    def _write(self, mm, offset, key, key_hash, value, expiry, now):
+        seq = SEQUENCE.unpack_from(mm, offset)[0] | 1
+        SEQUENCE.pack_into(mm, offset, seq)
+        start = offset + SLOT_HEADER.size
+        mm[start:start + len(key)] = key
+        mm[start + len(key):start + len(key) + len(value)] = value
+        SLOT_HEADER.pack_into(mm, offset, seq, key_hash, expiry, now, len(key), len(value))
+        # Only publish the even sequence once the rest of the slot is complete.
+        SEQUENCE.pack_into(mm, offset, seq + 1)
+
+    def _clear_slot(self, mm, offset):
+        seq = SEQUENCE.unpack_from(mm, offset)[0] | 1
+        SEQUENCE.pack_into(mm, offset, seq)
+        SLOT_HEADER.pack_into(mm, offset, seq, 0, -1.0, 0.0, 0, 0)
+        SEQUENCE.pack_into(mm, offset, seq + 1)
+
+    def _store(self, key, value, timeout, only_if_missing=False):
+        key = key.encode('utf-8')
+        value = pickle.dumps(value, self.pickle_protocol)
+        expiry = self.get_backend_timeout(timeout)
+        expiry = -1.0 if expiry is None else expiry
+        now = time.time()
+        key_hash, set_offset = self._hash(key)
+        fits = SLOT_HEADER.size + len(key) + len(value) <= self._slot_size
+        with self._locked(set_offset) as mm:
+            existing = self._find(mm, key, key_hash, set_offset, now)
+            if only_if_missing and existing is not None:
+                return False
+            if not fits:
+                # Too big to cache, but never leave a stale value behind.
+                if existing is not None:
+                    self._clear_slot(mm, existing)
+                return False
+            offset = self._victim(mm, key, key_hash, set_offset, now)
+            self._write(mm, offset, key, key_hash, value, expiry, now)
+            return True
+
+    # -------------------------------------------- #
+    # Django cache API
+    # -------------------------------------------- #
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._store(key, value, timeout, only_if_missing=True)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        value = self._read(key.encode('utf-8'), time.time())
+        if value is None:
+            return default
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._store(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        key = key.encode('utf-8')
+        expiry = self.get_backend_timeout(timeout)
+        expiry = -1.0 if expiry is None else expiry
+        now = time.time()
+        key_hash, set_offset = self._hash(key)
+        with self._locked(set_offset) as mm:
+            offset = self._find(mm, key, key_hash, set_offset, now)
+            if offset is None:
+                return False
+            seq, slot_hash, _, _, key_len, value_len = SLOT_HEADER.unpack_from(mm, offset)
+            SEQUENCE.pack_into(mm, offset, seq | 1)
+            SLOT_HEADER.pack_into(mm, offset, seq | 1, slot_hash, expiry, now, key_len, value_len)
+            SEQUENCE.pack_into(mm, offset, (seq | 1) + 1)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        encoded = key.encode('utf-8')
+        now = time.time()
+        key_hash, set_offset = self._hash(encoded)
+        with self._locked(set_offset) as mm:
+            offset = self._find(mm, encoded, key_hash, set_offset, now)
+            if offset is None:
+                raise ValueError("Key '%s' not found" % key)
+            _, _, expiry, _, key_len, value_len = SLOT_HEADER.unpack_from(mm, offset)
+            start = offset + SLOT_HEADER.size + key_len
+            new_value = pickle.loads(mm[start:start + value_len]) + delta
+            value = pickle.dumps(new_value, self.pickle_protocol)
+            if SLOT_HEADER.size + key_len + len(value) > self._slot_size:
+                self._clear_slot(mm, offset)
+            else:
+                self._write(mm, offset, encoded, key_hash, value, expiry, now)
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        value = self._read(key.encode('utf-8'), time.time())
+        return value is not None
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        encoded = key.encode('utf-8')
+        key_hash, set_offset = self._hash(encoded)
+        with self._locked(set_offset) as mm:
+            offset = self._find(mm, encoded, key_hash, set_offset, time.time())
+            if offset is None:
+                return False
+            self._clear_slot(mm, offset)
+            return True
+
+    def clear(self):
+        mm = self._map()
+        for set_offset in range(FILE_HEADER_SIZE, self._size, self._set_size):
+            with self._locked(set_offset):
+                for offset in range(set_offset, set_offset + self._set_size, self._slot_size):
+                    if SLOT_HEADER.unpack_from(mm, offset)[1]:
+                        self._clear_slot(mm, offset)
@@ -0,0 +1,138 @@
+import logging
+import weakref
+from inspect import isawaitable, iscoroutinefunction
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # Django < 3.0
+    sync_to_async = None
+
+from django_sanic_adaptor.background import BackgroundQueueFull
+
+logger = logging.getLogger('django.request')
+
+
+def offload_receiver(receiver):
+    """
+    Mark a signal receiver to run on the background thread pool instead of
+    inline on the event loop. Only use this for receivers which do not touch
+    thread-bound state such as Django database connections.
+    """
+    receiver.sanic_offload = True
+    return receiver
+
+
+class SignalDispatcher(object):
+    """
+    Sends Django signals on the request path without Signal.send().
+
+    The live receivers of each (signal, sender) pair are looked up once and
+    cached until a receiver is connected or disconnected, and sending to a
+    signal with no receivers costs one emptiness check. Receivers returning an
+    awaitable, and receivers marked with offload_receiver(), are handed to the
+    background task runner so they never hold up a response.
+    """
+
+    def __init__(self, runner):
+        """
+        :param BackgroundTaskRunner runner: Runs async and offloaded receivers.
+        """
+        self.runner = runner
+        self._cache = {}
+
+    def prime(self, signal, sender):
+        """Look up the receivers of `signal` ahead of the first request."""
+        return self._receivers(signal, sender)
+
+    def _receivers(self, signal, sender):
+        if not signal.receivers:
+            return ()
+        key = (id(signal), sender)
+        # connect() and disconnect() mutate the receivers list in place, so compare a snapshot of
+        # its references. Lookup keys are ids, which a new receiver can reuse.
+        version = (tuple(r[1] for r in signal.receivers), signal._dead_receivers)
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != version:
+            receivers = signal._live_receivers(sender)
+            if isinstance(receivers, tuple):  # Django >= 5.0 splits sync and async receivers.
+                receivers = list(receivers[0]) + list(receivers[1])
+            # _live_receivers() may have pruned dead receivers, so take the version again.
+            cached = self._cache[key] = ((tuple(r[1] for r in signal.receivers), signal._dead_receivers),
+                                         [_ref(receiver) for receiver in receivers])
+        receivers = [ref() for ref in cached[1]]
+        return [receiver for receiver in receivers if receiver is not None]
+
+    def send(self, signal, sender, robust=False, **named):
+        """
+        Send `signal` to its receivers. Unless `robust` is set, an exception
+        from an inline receiver propagates, as it does with Signal.send().
+        """
+        receivers = self._receivers(signal, sender)
+        if not receivers:
+            return
+        inline = [r for r in receivers if not self._schedule_receiver(r, False, signal, sender, named)]
+        self._schedule_results(_call_receivers(inline, signal, sender, robust, named))
+
+    async def asend(self, signal, sender, robust=False, **named):
+        """
+        As send(), but for Django's async request path: all the inline sync
+        receivers run together in one call to Django's thread-sensitive
+        executor, where sync views run too, so they never touch thread-bound
+        state from the event loop.
+        """
+        receivers = self._receivers(signal, sender)
+        if not receivers:
+            return
+        inline = [r for r in receivers if not self._schedule_receiver(r, True, signal, sender, named)]
+        if inline:
+            results = await sync_to_async(_call_receivers, thread_sensitive=True)(inline, signal, sender, robust, named)
+            self._schedule_results(results)
+
+    def _schedule_receiver(self, receiver, coroutines, signal, sender, named):
+        """
+        Hand `receiver` to the background runner if it is offloaded, or if
+        `coroutines` is set and it is a coroutine function. Return whether it was.
+        """
+        try:
+            if getattr(receiver, 'sanic_offload', False):
+                self.runner.schedule(receiver, in_executor=True, signal=signal, sender=sender, **named)
+                return True
+            if coroutines and iscoroutinefunction(receiver):
+                self.runner.schedule(receiver(signal=signal, sender=sender, **named))
+                return True
+        except BackgroundQueueFull:
+            logger.error('Dropped signal receiver %r, the background queue is full.', receiver)
+            return True
+        return False
+
+    def _schedule_results(self, results):
+        for (receiver, result) in results:
+            try:
+                self.runner.schedule(result)
+            except BackgroundQueueFull:
+                logger.error('Dropped signal receiver %r, the background queue is full.', receiver)
+
+
+def _ref(receiver):
+    """A reference to `receiver` which, like the signal's own, does not keep it alive."""
+    try:
+        if hasattr(receiver, '__self__') and hasattr(receiver, '__func__'):
+            return weakref.WeakMethod(receiver)
+        return weakref.ref(receiver)
+    except TypeError:  # Not weakly referenceable, so the signal holds it strongly anyway.
+        return lambda: receiver
+
+
+def _call_receivers(receivers, signal, sender, robust, named):
+    """Call sync `receivers` in turn, and return the (receiver, awaitable) pairs of those which returned one."""
+    results = []
+    for receiver in receivers:
+        try:
+            result = receiver(signal=signal, sender=sender, **named)
+            if isawaitable(result):
+                results.append((receiver, result))
+        except Exception:
+            if not robust:
+                raise
+            logger.exception('Error in signal receiver %r', receiver)
+    return results
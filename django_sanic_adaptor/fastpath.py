@@ -0,0 +1,306 @@
+"""
+Fast-path Django views, which skip the full Django middleware chain.
+
+Mark a view with the fast_path decorator and, when its URL pattern can be
+expressed as a Sanic route, it is mounted directly on the Sanic router at
+startup. URL prefixes can be put on the fast path too, with the
+SANIC_ADAPTOR_FAST_PATH_PREFIXES setting, a dict mapping each prefix to the
+list of middleware to run for it. Those requests are still resolved by
+Django's URL resolver, but skip all other middleware.
+
+Fast-path requests get a SanicDjangoAdaptorFastRequest, and only the
+middleware explicitly chosen for them. That middleware must use the
+process_request/process_view/process_response/process_exception hooks.
+"""
+import logging
+import re
+import sys
+from inspect import isawaitable, iscoroutinefunction
+
+try:
+    import django
+    from django.conf import settings
+    from django.core import signals
+    from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+    from django.utils.module_loading import import_string
+    try:
+        from django.urls import ResolverMatch, get_resolver, get_urlconf, set_urlconf
+    except ImportError:  # Django < 1.10
+        from django.core.urlresolvers import ResolverMatch, get_resolver, get_urlconf, set_urlconf
+    try:
+        from django.core.handlers.exception import response_for_exception
+    except ImportError:  # Django < 1.11
+        response_for_exception = None
+    # On the Django >= 3.1 async path sync code runs in Django's thread-sensitive
+    # executor, as its ORM refuses to run on the event loop.
+    ASYNC_DJANGO = django.VERSION >= (3, 1)
+    if ASYNC_DJANGO:
+        from asgiref.sync import sync_to_async
+except ImportError:
+    print("Django is not installed. Please install it before using this library.")
+    ASYNC_DJANGO = False
+
+from django_sanic_adaptor.adaptor_request import SanicDjangoAdaptorFastRequest
+
+logger = logging.getLogger('django.request')
+
+ALL_METHODS = frozenset(('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'))
+# A named group, with a simple body, in an old-style regex URL pattern.
+NAMED_GROUP = re.compile(r'\(\?P<(\w+)>([^()]+)\)')
+REGEX_SPECIAL = re.compile(r'(?<!\\)[.^$*+?{}\[\]|()]')
+
+
+def fast_path(view=None, middleware=()):
+    """
+    Put a Django view on the fast path. Use as `@fast_path`, or as
+    `@fast_path(middleware=['django.middleware.common.CommonMiddleware'])`
+    to run a chosen subset of middleware for it.
+    """
+    def decorator(view):
+        view.sanic_fast_path = tuple(middleware)
+        return view
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+def _no_get_response(request):
+    raise ImproperlyConfigured("Fast-path middleware must use the process_* middleware hooks.")
+
+
+def _adapt(fn, thread_sensitive=True):
+    """Return a version of `fn` safe to call from the event loop."""
+    if ASYNC_DJANGO and not iscoroutinefunction(fn):
+        return sync_to_async(fn, thread_sensitive=thread_sensitive)
+    return fn
+
+
+class FastPath(object):
+    """
+    Runs a Django view with a chosen subset of middleware hooks, and without
+    the middleware chain or (when `view` is given) the URL resolver.
+    """
+    request_class = SanicDjangoAdaptorFastRequest
+
+    def __init__(self, handler, middleware=(), view=None, url_name=None, namespaces=(),
+                 default_kwargs=None, converters=None):
+        """
+        :param SanicHandler handler: The adaptor handler, used for exception handling.
+        :param middleware: Dotted paths of the middleware to run.
+        :param view: The view to call. If None, the view is found with Django's URL resolver.
+        :param str url_name: The URL pattern name of `view`.
+        :param namespaces: The URL namespaces `view` is included under.
+        :param dict default_kwargs: Extra keyword arguments from the URL pattern.
+        :param dict converters: Django path converters for the Sanic route parameters.
+        """
+        self.handler = handler
+        self.view = view
+        self.__name__ = getattr(view, '__name__', 'fast_path')
+        self.url_name = url_name
+        self.namespaces = list(namespaces)
+        self.default_kwargs = default_kwargs or {}
+        self.converters = converters or {}
+        self._request_middleware = []
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._response_middleware = []
+        self._exception_middleware = []
+        self._load_middleware(middleware)
+
+    def _load_middleware(self, middleware):
+        for middleware_path in middleware:
+            mw_class = import_string(middleware_path)
+            try:
+                mw_instance = mw_class(_no_get_response)
+            except MiddlewareNotUsed:
+                continue
+            hooks = 0
+            if hasattr(mw_instance, 'process_request'):
+                self._request_middleware.append(_adapt(mw_instance.process_request))
+                hooks += 1
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.append(_adapt(mw_instance.process_view))
+                hooks += 1
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.insert(0, _adapt(mw_instance.process_template_response))
+                hooks += 1
+            if hasattr(mw_instance, 'process_response'):
+                self._response_middleware.insert(0, _adapt(mw_instance.process_response))
+                hooks += 1
+            if hasattr(mw_instance, 'process_exception'):
+                self._exception_middleware.insert(0, _adapt(mw_instance.process_exception))
+                hooks += 1
+            if not hooks:
+                raise ImproperlyConfigured(
+                    "Middleware %s has no process_* hooks and cannot be used on the fast path." % middleware_path)
+
+    def _resolve(self, request, kwargs):
+        if self.view is None:
+            resolver_match = get_resolver(get_urlconf()).resolve(request.path_info)
+        else:
+            if self.converters:
+                kwargs = {k: (self.converters[k].to_python(v) if k in self.converters else v)
+                          for (k, v) in kwargs.items()}
+            if self.default_kwargs:
+                kwargs = dict(self.default_kwargs, **kwargs)
+            resolver_match = ResolverMatch(self.view, (), kwargs, self.url_name, namespaces=self.namespaces)
+        request.resolver_match = resolver_match
+        return resolver_match
+
+    async def async_get_response(self, request, kwargs=None):
+        """Return the HttpResponse for a fast-path request."""
+        set_urlconf(settings.ROOT_URLCONF)
+        response = None
+        try:
+            for middleware_method in self._request_middleware:
+                response = middleware_method(request)
+                if isawaitable(response):
+                    response = await response
+                if response:
+                    break
+
+            if response is None:
+                callback, callback_args, callback_kwargs = self._resolve(request, kwargs or {})
+                for middleware_method in self._view_middleware:
+                    response = middleware_method(request, callback, callback_args, callback_kwargs)
+                    if isawaitable(response):
+                        response = await response
+                    if response:
+                        break
+
+            if response is None:
+                wrapped_callback = _adapt(self.handler.make_view_atomic(callback))
+                try:
+                    response = wrapped_callback(request, *callback_args, **callback_kwargs)
+                    if isawaitable(response):
+                        response = await response
+                except Exception as e:
+                    for middleware_method in self._exception_middleware:
+                        response = middleware_method(request, e)
+                        if isawaitable(response):
+                            response = await response
+                        if response:
+                            break
+                    if response is None:
+                        raise
+
+            if response is None:
+                raise ValueError("The fast-path view %r didn't return an HttpResponse object. "
+                                 "It returned None instead." % (request.resolver_match.func,))
+
+            if hasattr(response, 'render') and callable(response.render):
+                for middleware_method in self._template_response_middleware:
+                    response = middleware_method(request, response)
+                    if isawaitable(response):
+                        response = await response
+                response = _adapt(response.render)()
+                if isawaitable(response):
+                    response = await response
+        except Exception as e:
+            response = await self._response_for_exception(request, e)
+
+        try:
+            for middleware_method in self._response_middleware:
+                response = middleware_method(request, response)
+                if isawaitable(response):
+                    response = await response
+                if response is None:
+                    raise ValueError(
+                        "%s.process_response didn't return an "
+                        "HttpResponse object. It returned None instead."
+                        % (middleware_method.__self__.__class__.__name__))
+        except Exception as e:
+            response = await self._response_for_exception(request, e)
+
+        if hasattr(response, '_resource_closers'):  # Django >= 3.0
+            response._resource_closers.append(request.close)
+        else:
+            response._closable_objects.append(request)
+        return response
+
+    async def _response_for_exception(self, request, exc):
+        if response_for_exception is not None:
+            if ASYNC_DJANGO:
+                return await sync_to_async(response_for_exception, thread_sensitive=False)(request, exc)
+            return response_for_exception(request, exc)
+        self.handler.signals.send(signals.got_request_exception, self.handler.__class__, request=request)
+        return self.handler.handle_uncaught_exception(request, get_resolver(get_urlconf()), sys.exc_info())
+
+
+def _pattern_parts(pattern):
+    """Return (Sanic route fragment, converters) for one URL pattern, or None if it has no Sanic equivalent."""
+    route_pattern = getattr(pattern, 'pattern', None)
+    route = getattr(route_pattern, '_route', None)
+    if route is not None:  # A Django >= 2.0 path() pattern.
+        converters = dict(route_pattern.converters)
+        fragment = re.sub(r'<(?:(\w+):)?(\w+)>',
+                          lambda m: '<{:s}:{:s}>'.format(m.group(2), converters[m.group(2)].regex), route)
+        return fragment, converters
+    regex = getattr(route_pattern, '_regex', None)
+    if regex is None:
+        regex = getattr(getattr(pattern, 'regex', None), 'pattern', None)
+    if not isinstance(regex, str):
+        return None
+    if regex.startswith('^'):
+        regex = regex[1:]
+    for end in ('$', r'\Z'):
+        if regex.endswith(end) and not regex.endswith('\\' + end):
+            regex = regex[:-len(end)]
+    fragments = []
+    position = 0
+    for group in NAMED_GROUP.finditer(regex):
+        fragments.append(_literal(regex[position:group.start()]))
+        fragments.append('<{:s}:{:s}>'.format(group.group(1), group.group(2)))
+        position = group.end()
+    fragments.append(_literal(regex[position:]))
+    if None in fragments:
+        return None
+    return ''.join(fragments), {}
+
+
+def _literal(regex):
+    """Unescape a regex fragment which should match only literal text, or return None if it does not."""
+    if REGEX_SPECIAL.search(regex):
+        return None
+    return re.sub(r'\\(.)', r'\1', regex)
+
+
+def _walk(patterns, prefix='', converters=None, namespaces=()):
+    for pattern in patterns:
+        parts = _pattern_parts(pattern)
+        if hasattr(pattern, 'url_patterns'):
+            if parts is None:
+                continue
+            namespace = getattr(pattern, 'namespace', None)
+            for found in _walk(pattern.url_patterns, prefix + parts[0], dict(converters or {}, **parts[1]),
+                               namespaces + ((namespace,) if namespace else ())):
+                yield found
+        else:
+            callback = getattr(pattern, 'callback', None)
+            if getattr(callback, 'sanic_fast_path', None) is None:
+                continue
+            if parts is None:
+                logger.warning('Cannot mount fast-path view %r on the Sanic router, its URL pattern is too complex.',
+                               callback)
+                continue
+            yield (pattern, callback, '/' + prefix + parts[0], dict(converters or {}, **parts[1]), namespaces)
+
+
+def mount_fast_paths(handler):
+    """
+    Mount the fast-path views on the Sanic router, and set up the fast-path
+    URL prefixes of `handler`. Called once at startup.
+    """
+    for pattern, callback, uri, converters, namespaces in _walk(get_resolver(get_urlconf()).url_patterns):
+        path = FastPath(handler, callback.sanic_fast_path, view=callback, url_name=pattern.name,
+                        namespaces=namespaces, default_kwargs=getattr(pattern, 'default_args', None),
+                        converters=converters)
+        try:
+            handler.app.add_route(path, uri, methods=ALL_METHODS, strict_slashes=True)
+        except Exception:
+            logger.warning('Cannot mount fast-path view %r on the Sanic router at %s.', callback, uri, exc_info=True)
+
+    prefixes = getattr(settings, 'SANIC_ADAPTOR_FAST_PATH_PREFIXES', {})
+    handler.fast_path_prefixes = [(prefix, FastPath(handler, prefixes[prefix]))
+                                  for prefix in sorted(prefixes, key=len, reverse=True)]
+    handler.fast_path_prefix_match = tuple(prefixes)
@@ -0,0 +1,168 @@
+"""
+Replay traffic recorded by django_sanic_adaptor.recorder offline against a
+local application, to measure latency and throughput:
+
+    DJANGO_SETTINGS_MODULE=mysite.settings python -m django_sanic_adaptor.loadtest traffic.jsonl -c 32
+"""
+import argparse
+import asyncio
+import sys
+import time
+from bisect import bisect_left
+
+from django_sanic_adaptor.recorder import REDACTED_VALUE, load_traffic
+from django_sanic_adaptor.testing import make_sanic_request
+
+# Latency histogram bucket upper bounds, in milliseconds.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class ReplayReport(object):
+
+    def __init__(self, latencies, statuses, errors, elapsed):
+        self.latencies = sorted(latencies)
+        self.statuses = statuses
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self):
+        return self.errors / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Latency at percentile `p` (0-100), in seconds."""
+        if not self.latencies:
+            return 0.0
+        return self.latencies[min(len(self.latencies) - 1, int(len(self.latencies) * p / 100.0))]
+
+    def histogram(self):
+        """Return a list of (bucket upper bound in ms, count) pairs, the last bound is None."""
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in self.latencies:
+            counts[bisect_left(LATENCY_BUCKETS_MS, latency * 1000.0)] += 1
+        return list(zip(LATENCY_BUCKETS_MS + (None,), counts))
+
+    def format(self):
+        lines = [
+            "Requests:   {:d} in {:.2f}s".format(self.count, self.elapsed),
+            "Throughput: {:.1f} req/s".format(self.throughput),
+            "Errors:     {:d} ({:.2%})".format(self.errors, self.error_rate),
+            "Latency:    p50 {:.2f}ms  p90 {:.2f}ms  p99 {:.2f}ms  max {:.2f}ms".format(
+                self.percentile(50) * 1000.0, self.percentile(90) * 1000.0,
+                self.percentile(99) * 1000.0, self.percentile(100) * 1000.0),
+            "Statuses:   " + "  ".join("{}: {:d}".format(k, v) for (k, v) in sorted(self.statuses.items(), key=lambda i: str(i[0]))),
+            "Histogram:",
+        ]
+        peak = max([c for (_, c) in self.histogram()] + [1])
+        for (bound, count) in self.histogram():
+            label = "<= {:d}ms".format(bound) if bound is not None else "> {:d}ms".format(LATENCY_BUCKETS_MS[-1])
+            lines.append("  {:>11s} {:7d} {:s}".format(label, count, '#' * int(40 * count / peak)))
+        return '\n'.join(lines)
+
+
+def _replay_headers(recorded, headers):
+    """The headers to replay a record with: redacted headers are dropped, and `headers` added."""
+    result = {name: value for (name, value) in (recorded or {}).items() if value != REDACTED_VALUE}
+    if headers:
+        lowered = {name.lower() for name in headers}
+        result = {name: value for (name, value) in result.items() if name.lower() not in lowered}
+        result.update(headers)
+    return result
+
+
+async def replay(app, records, concurrency=10, repeat=1, headers=None):
+    """
+    Replay recorded requests through `app.handle_request` without a network.
+
+    Headers which were redacted when recording are not replayed, pass them
+    (for instance a test user's session cookie) in `headers` instead.
+
+    :param app: A Sanic application, usually from get_sanic_application().
+    :param list records: Records as returned by load_traffic().
+    :param int concurrency: Number of requests kept in flight at once.
+    :param int repeat: Number of times to replay the whole recording.
+    :param dict headers: Headers added to every replayed request.
+    :rtype: ReplayReport
+    """
+    queue = [r for _ in range(repeat) for r in records]
+    queue.reverse()
+    latencies = []
+    statuses = {}
+    errors = 0
+
+    async def _one(record):
+        nonlocal errors
+        status = None
+
+        def _write(response):
+            nonlocal status
+            status = response.status
+
+        async def _stream(response):
+            nonlocal status
+            status = response.status
+            response.transport = request.transport
+            await response.stream()
+
+        request = make_sanic_request(app, record['m'], record['p'], _replay_headers(record.get('h'), headers),
+                                     b' ' * record.get('b', 0))
+        start = time.perf_counter()
+        try:
+            await app.handle_request(request, _write, _stream)
+        except Exception:
+            status = 'exception'
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 500:
+            errors += 1
+
+    async def _worker():
+        while queue:
+            await _one(queue.pop())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_worker() for _ in range(max(1, concurrency))])
+    return ReplayReport(latencies, statuses, errors, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded traffic against the local Django application.")
+    parser.add_argument('traffic', nargs='+', help="Traffic files written by the recorder.")
+    parser.add_argument('-c', '--concurrency', type=int, default=10)
+    parser.add_argument('-r', '--repeat', type=int, default=1)
+    parser.add_argument('-H', '--header', action='append', default=[], metavar='"NAME: VALUE"',
+                        help="Header to send with every request, e.g. a session cookie. Can be repeated.")
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help="Seconds to wait for background tasks after the replay.")
+    args = parser.parse_args(argv)
+    headers = {}
+    for header in args.header:
+        name, sep, value = header.partition(':')
+        if not sep:
+            parser.error("Headers must look like \"NAME: VALUE\", not {!r}.".format(header))
+        headers[name.strip()] = value.strip()
+
+    from django_sanic_adaptor import get_sanic_application
+    app = get_sanic_application()
+    # Never append the replay to a recording configured in the settings.
+    if app.handle_request.recorder is not None:
+        app.handle_request.recorder.close()
+        app.handle_request.recorder = None
+    records = [r for path in args.traffic for r in load_traffic(path)]
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(replay(app, records, args.concurrency, args.repeat, headers))
+    loop.run_until_complete(app.handle_request.background.drain(args.drain_timeout))
+    print(report.format())
+    return 0 if report.count else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
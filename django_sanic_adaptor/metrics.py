@@ -0,0 +1,243 @@
+import logging
+import mmap
+import multiprocessing
+import os
+import struct
+from bisect import bisect_left
+
+logger = logging.getLogger('django_sanic_adaptor.metrics')
+
+# Request duration histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATUS_CLASSES = ('1xx', '2xx', '3xx', '4xx', '5xx', 'abandoned')
+# Recorded for requests whose client went away before a response, as nginx does.
+ABANDONED_STATUS = 499
+OTHER_ROUTE = '<other>'
+UNMATCHED_ROUTE = '<unmatched>'
+LABEL_SIZE = 128
+
+
+class Metrics(object):
+    """
+    Per-route request metrics, aggregated across forked workers.
+
+    All counters live in one anonymous shared memory segment, created before
+    the Sanic workers are forked. The segment holds a table of route labels,
+    and one block of counters per worker. Each worker only ever writes to its
+    own block, so recording a request takes no locks. A lock is only taken
+    the first time a worker sees a new route label. Any worker can render
+    the totals of all workers.
+
+    Each worker block is laid out as doubles:
+        [in-flight, (count, duration sum, size sum, bucket counts...) * status classes * routes]
+
+    Requests abandoned by their client are counted under their own
+    "abandoned" status class, not as 4xx or 5xx.
+    """
+
+    def __init__(self, max_routes=512, max_workers=64, buckets=DEFAULT_BUCKETS):
+        """
+        :param int max_routes: Number of distinct route labels, later routes are counted as "<other>".
+        :param int max_workers: Number of worker processes which can record at once.
+        :param buckets: Upper bounds of the duration histogram buckets, in seconds.
+        """
+        self.max_routes = max_routes
+        self.max_workers = max_workers
+        self.buckets = tuple(buckets)
+        self._row_size = 3 + len(self.buckets) + 1
+        self._route_size = self._row_size * len(STATUS_CLASSES)
+        self._worker_size = 1 + self._route_size * max_routes
+        labels_size = 8 + LABEL_SIZE * max_routes
+        self._labels_size = labels_size + (-labels_size % 8)
+        self._pids_size = 8 * max_workers
+        size = self._labels_size + self._pids_size + 8 * self._worker_size * max_workers
+        self._mmap = mmap.mmap(-1, size)
+        self._pids = memoryview(self._mmap)[self._labels_size:self._labels_size + self._pids_size].cast('q')
+        self._values = memoryview(self._mmap)[self._labels_size + self._pids_size:].cast('d')
+        self._lock = multiprocessing.Lock()
+        self._pid = None
+        self._base = None
+        self._routes = {}
+        self._register_route(OTHER_ROUTE)
+
+    @classmethod
+    def from_settings(cls, settings):
+        if not getattr(settings, 'SANIC_ADAPTOR_METRICS', False):
+            return None
+        return cls(max_routes=getattr(settings, 'SANIC_ADAPTOR_METRICS_MAX_ROUTES', 512),
+                   max_workers=getattr(settings, 'SANIC_ADAPTOR_METRICS_MAX_WORKERS', 64),
+                   buckets=getattr(settings, 'SANIC_ADAPTOR_METRICS_BUCKETS', DEFAULT_BUCKETS))
+
+    # -------------------------------------------- #
+    # Recording, on the hot path
+    # -------------------------------------------- #
+
+    def request_started(self):
+        base = self._base if self._pid == os.getpid() else self._claim_worker()
+        if base is not None:
+            self._values[base] += 1
+
+    def request_finished(self, route, status, duration, size):
+        """
+        :param str route: The Django url_name or Sanic route the request was dispatched to.
+        :param int status: The response status code, or ABANDONED_STATUS.
+        :param float duration: Seconds taken to handle the request.
+        :param int size: Response body size in bytes.
+        """
+        base = self._base if self._pid == os.getpid() else self._claim_worker()
+        if base is None:
+            return
+        values = self._values
+        values[base] -= 1
+        try:
+            route_index = self._routes[route]
+        except KeyError:
+            route_index = self._register_route(route)
+        if status == ABANDONED_STATUS:
+            status_index = 5
+        else:
+            status_index = min(max(status // 100, 1), 5) - 1
+        offset = base + 1 + route_index * self._route_size + status_index * self._row_size
+        values[offset] += 1
+        values[offset + 1] += duration
+        values[offset + 2] += size
+        values[offset + 3 + bisect_left(self.buckets, duration)] += 1
+
+    # -------------------------------------------- #
+    # Shared memory bookkeeping
+    # -------------------------------------------- #
+
+    def _claim_worker(self):
+        """Find this process's counter block, claiming a free one on first use after a fork."""
+        pid = os.getpid()
+        self._pid = pid
+        self._base = None
+        self._routes = {}
+        with self._lock:
+            free = None
+            for index in range(self.max_workers):
+                owner = self._pids[index]
+                if owner == pid:
+                    free = index
+                    break
+                if free is None and (owner == 0 or not _pid_alive(owner)):
+                    free = index
+            if free is None:
+                logger.warning('No free metrics slot for worker %d, raise SANIC_ADAPTOR_METRICS_MAX_WORKERS.', pid)
+                return None
+            self._pids[free] = pid
+        self._base = free * self._worker_size
+        # A slot left by a dead worker keeps its counters, but nothing of it is in flight any more.
+        self._values[self._base] = 0
+        return self._base
+
+    def _route_count(self):
+        return struct.unpack_from('q', self._mmap, 0)[0]
+
+    def _raw_label(self, index):
+        start = 8 + LABEL_SIZE * index
+        return self._mmap[start:start + LABEL_SIZE].rstrip(b'\0')
+
+    def _label(self, index):
+        return self._raw_label(index).decode('utf-8', 'ignore')
+
+    def _register_route(self, route):
+        encoded = route.encode('utf-8')[:LABEL_SIZE]
+        with self._lock:
+            count = self._route_count()
+            for index in range(count):
+                if self._raw_label(index) == encoded:
+                    break
+            else:
+                if count >= self.max_routes:
+                    index = 0  # OTHER_ROUTE
+                else:
+                    index = count
+                    start = 8 + LABEL_SIZE * index
+                    self._mmap[start:start + len(encoded)] = encoded
+                    struct.pack_into('q', self._mmap, 0, count + 1)
+        self._routes[route] = index
+        return index
+
+    # -------------------------------------------- #
+    # Exposition
+    # -------------------------------------------- #
+
+    def render(self):
+        """Render the totals of all workers in the Prometheus text exposition format."""
+        values = self._values
+        labels = [self._label(i) for i in range(self._route_count())]
+        in_flight = 0.0
+        rows = {}
+        for worker in range(self.max_workers):
+            if not self._pids[worker]:
+                continue
+            base = worker * self._worker_size
+            in_flight += values[base]
+            for route_index, route in enumerate(labels):
+                for status_index, status in enumerate(STATUS_CLASSES):
+                    offset = base + 1 + route_index * self._route_size + status_index * self._row_size
+                    if not values[offset]:
+                        continue
+                    row = rows.get((route, status))
+                    if row is None:
+                        row = rows[(route, status)] = [0.0] * self._row_size
+                    for i in range(self._row_size):
+                        row[i] += values[offset + i]
+
+        lines = [
+            '# HELP sanic_adaptor_requests_in_flight Requests currently being handled.',
+            '# TYPE sanic_adaptor_requests_in_flight gauge',
+            'sanic_adaptor_requests_in_flight {}'.format(_number(in_flight)),
+            '# HELP sanic_adaptor_requests_total Requests handled, by route and status class.',
+            '# TYPE sanic_adaptor_requests_total counter',
+        ]
+        ordered = sorted(rows.items())
+        for (route, status), row in ordered:
+            lines.append('sanic_adaptor_requests_total{{{:s}}} {:s}'.format(_labels(route, status), _number(row[0])))
+        lines.append('# HELP sanic_adaptor_response_size_bytes_total Response body bytes sent, by route and status class.')
+        lines.append('# TYPE sanic_adaptor_response_size_bytes_total counter')
+        for (route, status), row in ordered:
+            lines.append('sanic_adaptor_response_size_bytes_total{{{:s}}} {:s}'.format(
+                _labels(route, status), _number(row[2])))
+        lines.append('# HELP sanic_adaptor_request_duration_seconds Time taken to handle requests.')
+        lines.append('# TYPE sanic_adaptor_request_duration_seconds histogram')
+        for (route, status), row in ordered:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (None,), row[3:]):
+                cumulative += count
+                lines.append('sanic_adaptor_request_duration_seconds_bucket{{{:s},le="{:s}"}} {:s}'.format(
+                    _labels(route, status), '+Inf' if bound is None else repr(float(bound)), _number(cumulative)))
+            lines.append('sanic_adaptor_request_duration_seconds_sum{{{:s}}} {!r}'.format(_labels(route, status), row[1]))
+            lines.append('sanic_adaptor_request_duration_seconds_count{{{:s}}} {:s}'.format(
+                _labels(route, status), _number(row[0])))
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _number(value):
+    return '{:d}'.format(int(value)) if value == int(value) else repr(value)
+
+
+def _labels(route, status):
+    route = route.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return 'route="{:s}",status="{:s}"'.format(route, status)
+
+
+def route_label(sanic_request, django_request):
+    """The label a request's metrics are recorded under."""
+    if django_request is not None:
+        match = django_request.resolver_match
+        if match is not None:
+            return match.url_name or match.view_name or UNMATCHED_ROUTE
+        return UNMATCHED_ROUTE
+    return getattr(sanic_request, 'uri_template', None) or UNMATCHED_ROUTE
@@ -0,0 +1,86 @@
+"""
+Record the shape of live traffic at the SanicHandler boundary, to replay it
+offline with django_sanic_adaptor.loadtest.
+
+Recording is enabled with the SANIC_ADAPTOR_TRAFFIC_RECORD_FILE setting. The
+file name may contain "{pid}" so each worker writes its own file.
+"""
+import json
+import os
+import random
+import time
+
+# Header values that are never written to a traffic file.
+REDACTED_HEADERS = frozenset(('authorization', 'cookie', 'proxy-authorization', 'x-csrftoken'))
+REDACTED_VALUE = '<redacted>'
+
+
+class TrafficRecorder(object):
+    """
+    Appends one compact JSON line per request to a file:
+    {"t": seconds since recording started, "m": method, "p": path and query,
+     "h": headers, "b": body size in bytes}
+    """
+
+    def __init__(self, path, sample_rate=1.0, flush_every=100):
+        """
+        :param str path: File to append to, "{pid}" is replaced by the worker pid.
+        :param float sample_rate: Fraction of requests to record.
+        :param int flush_every: Number of records buffered before they are written out.
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_every = flush_every
+        self._file = None
+        self._buffer = []
+        self._started = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        path = getattr(settings, 'SANIC_ADAPTOR_TRAFFIC_RECORD_FILE', None)
+        if not path:
+            return None
+        return cls(path, sample_rate=getattr(settings, 'SANIC_ADAPTOR_TRAFFIC_RECORD_SAMPLE', 1.0))
+
+    def record(self, request):
+        """
+        :param SanicRequest request: The request as received from the Sanic server.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        now = time.time()
+        if self._started is None:
+            self._started = now
+        path = request.path
+        if request.query_string:
+            path = '{:s}?{:s}'.format(path, request.query_string)
+        headers = {k: (REDACTED_VALUE if k.lower() in REDACTED_HEADERS else v)
+                   for (k, v) in request.headers.items()}
+        self._buffer.append(json.dumps({
+            't': round(now - self._started, 4), 'm': request.method, 'p': path,
+            'h': headers, 'b': len(request.body or b''),
+        }, separators=(',', ':')))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            # Opened lazily so that each forked worker gets its own file handle.
+            self._file = open(self.path.format(pid=os.getpid()), 'a', encoding='utf-8')
+        self._file.write('\n'.join(self._buffer) + '\n')
+        self._file.flush()
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_traffic(path):
+    """Read the records written by a TrafficRecorder."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import sys
+import time
 import types
 import warnings
 from inspect import isawaitable
@@ -21,20 +23,29 @@ try:
     from django.utils.version import get_complete_version
     from django.http.multipartparser import MultiPartParserError
     from django.conf import settings
-    from django.core import signals, urlresolvers
+    from django.core import signals
     from django.core.handlers.base import BaseHandler
+    from django.db import connections
     from django.views import debug
     django_version = get_complete_version(None)
     if django_version >= (1, 10, 0):
         from django.urls import get_resolver, get_urlconf, set_urlconf
         from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
         from django.utils.module_loading import import_string
-        from django.utils.deprecation import RemovedInDjango20Warning
         from django.core.handlers.exception import (
             convert_exception_to_response, get_exception_response,
             handle_uncaught_exception,
         )
+        if django_version < (2, 0, 0):
+            from django.utils.deprecation import RemovedInDjango20Warning
+        if django_version >= (3, 1, 0):
+            from asgiref.sync import SyncToAsync, sync_to_async
+            try:
+                from asgiref.sync import ThreadSensitiveContext
+            except ImportError:  # asgiref < 3.3
+                ThreadSensitiveContext = None
     else:
+        from django.core import urlresolvers
         from django.utils.encoding import force_text
 except ImportError:
     print("Django is not installed. Please install it before using this library.")
@@ -42,17 +53,66 @@ except ImportError:
     django_version = (0, 0, 0)
 
 from django_sanic_adaptor import SanicDjangoAdaptorRequest, SanicDjangoAdaptorResponse, SanicDjangoAdaptorStreamingResponse
+from django_sanic_adaptor.background import BackgroundTaskRunner, BackgroundQueueFull
+from django_sanic_adaptor.recorder import TrafficRecorder
+from django_sanic_adaptor.stall_detector import StallDetector
+from django_sanic_adaptor.metrics import ABANDONED_STATUS, Metrics, route_label
+from django_sanic_adaptor.fastpath import FastPath, mount_fast_paths
+from django_sanic_adaptor.dispatch import SignalDispatcher
 
 logger = logging.getLogger('django.request')
 
+# Key of the Django request in the Sanic request's dict.
+DJANGO_REQUEST_KEY = 'django_sanic_adaptor.django_request'
+
+
+class RequestDeadlineExceeded(Exception):
+    """Raised when a Django view runs past its route's deadline."""
+    pass
+
+
+class _NoContext(object):
+    """Stands in for asgiref's ThreadSensitiveContext where there is none."""
+
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+if django_version >= (3, 1, 0) and ThreadSensitiveContext is not None:
+    class _RequestContext(ThreadSensitiveContext):
+        """
+        Gives a request its own thread for its sync code, as Django's ASGIHandler
+        does, so a sync view still running after its deadline doesn't hold up the
+        sync code of every other request. Unlike ThreadSensitiveContext, leaving
+        doesn't wait for that thread, which may still be running such a view.
+        """
+
+        async def __aexit__(self, exc, value, tb):
+            executor = SyncToAsync.context_to_thread_executor.pop(self, None)
+            if executor is not None:
+                executor.shutdown(wait=False)
+            return await super(_RequestContext, self).__aexit__(exc, value, tb)
+
+    _request_context = _RequestContext
+else:
+    _request_context = _NoContext
+
 
 class SanicHandler(BaseHandler):
     #initLock = Lock()
     request_class = SanicDjangoAdaptorRequest
+    # Django >= 2.0 no longer has this, but it still marks whether the middleware is loaded.
+    _request_middleware = None
 
     def __new__(cls, *args, **kwargs):
         cls = super(SanicHandler, cls).__new__(cls)
-        if django_version >= (1, 10, 0):
+        if django_version >= (3, 1, 0):
+            cls.async_get_response = cls.async_get_response_dj_3_1
+            cls.async_load_middleware = cls.async_load_middleware_dj_3_1
+        elif django_version >= (1, 10, 0):
             cls.async_get_response = cls.async_get_response_dj_1_10
             cls._get_response = cls._get_response_inner_dj_1_10
             cls._legacy_get_response = cls.async_legacy_get_response_dj_1_10
@@ -64,6 +124,25 @@ class SanicHandler(BaseHandler):
     def __init__(self, app):
         super(SanicHandler, self).__init__()
         self.app = app
+        self.background = BackgroundTaskRunner.from_settings(settings)
+        self.signals = SignalDispatcher(self.background)
+        for signal in (signals.request_started, signals.request_finished, signals.got_request_exception):
+            self.signals.prime(signal, self.__class__)
+        self.recorder = TrafficRecorder.from_settings(settings)
+        self.stall_detector = StallDetector.from_settings(settings)
+        self.metrics = Metrics.from_settings(settings)
+        self.request_deadline = getattr(settings, 'SANIC_ADAPTOR_REQUEST_DEADLINE', None)
+        route_deadlines = getattr(settings, 'SANIC_ADAPTOR_ROUTE_DEADLINES', {})
+        # Longest prefix first, so the most specific deadline wins.
+        self.route_deadlines = sorted(route_deadlines.items(), key=lambda item: len(item[0]), reverse=True)
+        self.disconnect_poll_interval = getattr(settings, 'SANIC_ADAPTOR_DISCONNECT_POLL_INTERVAL', None)
+        # The Sanic requests being handled, by id as they are dicts.
+        self._in_flight = {}
+        self.draining = False
+        self._drained = None
+        # Set up by mount_fast_paths(), longest prefix first.
+        self.fast_path_prefixes = []
+        self.fast_path_prefix_match = ()
 
     async def async_get_response(self, request):
         return NotImplementedError("This should not occur.")
@@ -71,6 +150,22 @@ class SanicHandler(BaseHandler):
     async def async_load_middleware(self):
         return self.load_middleware()
 
+    async def async_load_middleware_dj_3_1(self):
+        """
+        Let Django build its own async middleware chain. Async-capable
+        middleware is called directly, only sync-only middleware is adapted.
+        """
+        self.load_middleware(is_async=True)
+        self._request_middleware = []
+
+    async def async_get_response_dj_3_1(self, request):
+        """
+        Return an HttpResponse object for the given HttpRequest, using Django's
+        native async request path. Coroutine views are awaited directly on the
+        loop, with no sync_to_async thread hop.
+        """
+        return await self.get_response_async(request)
+
     # This function is protected under the Django BSD 3-Clause licence
     # This function is reproduced under the terms of the Django Licence
     # See DJANGO_LICENCE in this source code repository
@@ -196,7 +291,7 @@ class SanicHandler(BaseHandler):
                         "HttpResponse object. It returned None instead."
                         % (middleware_method.__self__.__class__.__name__))
         except Exception:  # Any exception should be gathered and handled
-            signals.got_request_exception.send(sender=self.__class__, request=request)
+            self.signals.send(signals.got_request_exception, self.__class__, request=request)
             response = self.handle_uncaught_exception(request, get_resolver(get_urlconf()), sys.exc_info())
 
         response._closable_objects.append(request)
@@ -428,7 +523,7 @@ class SanicHandler(BaseHandler):
 
         except Exception:  # Handle everything else.
             # Get the exception info now, in case another exception is thrown later.
-            signals.got_request_exception.send(sender=self.__class__, request=request)
+            self.signals.send(signals.got_request_exception, self.__class__, request=request)
             response = self.handle_uncaught_exception(request, resolver, sys.exc_info())
 
         try:
@@ -445,7 +540,7 @@ class SanicHandler(BaseHandler):
                         % (middleware_method.__self__.__class__.__name__))
             response = self.apply_response_fixes(request, response)
         except Exception:  # Any exception should be gathered and handled
-            signals.got_request_exception.send(sender=self.__class__, request=request)
+            self.signals.send(signals.got_request_exception, self.__class__, request=request)
             response = self.handle_uncaught_exception(request, resolver, sys.exc_info())
 
         response._closable_objects.append(request)
@@ -455,7 +550,7 @@ class SanicHandler(BaseHandler):
     # This function is protected under the Sanic MIT licence
     # This function is reproduced under the terms of the Sanic Licence
     # See SANIC_LICENCE in this source code repository
-    async def __call__(self, request, write_callback, stream_callback):
+    async def _handle_request(self, request, write_callback, stream_callback):
         """ This is essentially directly copied from Sanic handle_request() function
         Take a request from the HTTP Server and return a response object
         to be sent back The HTTP Server only expects a response object, so
@@ -467,90 +562,332 @@ class SanicHandler(BaseHandler):
         :param stream_callback: Coroutine that handles streaming a
             StreamingHTTPResponse if produced by the handler.
 
-        :return: Nothing
+        :return: The response which was written, and the Django request if there was one
         """
-        try:
-            # -------------------------------------------- #
-            # Request Middleware
-            # -------------------------------------------- #
-
-            request.app = self.app
-            if self._request_middleware is None:
-                try:
-                    await self.async_load_middleware()
-                except Exception:
-                    # Unload whatever middleware we got
-                    self._request_middleware = None
-                    raise
-            signals.request_started.send(sender=self.__class__)
-
-            # Run Sanic Middleware
-            response = await self.app._run_request_middleware(request)
-            # No middleware results
-            if not response:
+        django_request = django_response = response = None
+        cancelled = False
+        async with _request_context():
+            try:
                 # -------------------------------------------- #
-                # Execute Handler
+                # Request Middleware
                 # -------------------------------------------- #
-                # Fetch possible handler from Sanic router first
-                try:
-                    sanic_handler, args, kwargs, uri = self.app.router.get(request)
-                    if sanic_handler is not None:
-                        request.uri_template = uri
-                        # Run response handler
-                        response = sanic_handler(request, *args, **kwargs)
-                except NotFound:
-                    pass
+
+                request.app = self.app
+                if self._request_middleware is None:
+                    try:
+                        await self.async_load_middleware()
+                    except Exception:
+                        # Unload whatever middleware we got
+                        self._request_middleware = None
+                        raise
+                if django_version >= (3, 1, 0):
+                    await self.signals.asend(signals.request_started, self.__class__)
+                else:
+                    self.signals.send(signals.request_started, self.__class__)
+
+                # Run Sanic Middleware
+                response = await self.app._run_request_middleware(request)
+                # No middleware results
                 if not response:
-                    # Now do the Django magic.
+                    # -------------------------------------------- #
+                    # Execute Handler
+                    # -------------------------------------------- #
+                    # Fetch possible handler from Sanic router first
+                    fast_path = fast_path_kwargs = None
                     try:
-                        django_request = self.request_class(request)
-                    except UnicodeDecodeError:
-                        logger.warning('Bad Request (UnicodeDecodeError)',
-                                       exc_info=sys.exc_info(),
-                                       extra={'status_code': 400,})
-                        response = HTTPResponse(status=401) #bad request
-                    else:
-                        django_response = await self.async_get_response(django_request)
-                        if django_response.streaming:
-                            response = SanicDjangoAdaptorStreamingResponse(django_response)
+                        sanic_handler, args, kwargs, uri = self.app.router.get(request)
+                        if isinstance(sanic_handler, FastPath):
+                            # A Django view mounted on the Sanic router by mount_fast_paths()
+                            request.uri_template = uri
+                            fast_path, fast_path_kwargs = sanic_handler, kwargs
+                        elif sanic_handler is not None:
+                            request.uri_template = uri
+                            # Run response handler
+                            response = sanic_handler(request, *args, **kwargs)
+                    except NotFound:
+                        pass
+                    if not response:
+                        if fast_path is None and self.fast_path_prefixes and \
+                                request.path.startswith(self.fast_path_prefix_match):
+                            fast_path = next(p for (prefix, p) in self.fast_path_prefixes
+                                             if request.path.startswith(prefix))
+                        request_class = self.request_class if fast_path is None else fast_path.request_class
+                        # Now do the Django magic.
+                        try:
+                            django_request = request_class(request)
+                            # Lets __call__ find the route of a request abandoned while awaiting the view.
+                            request[DJANGO_REQUEST_KEY] = django_request
+                        except UnicodeDecodeError:
+                            logger.warning('Bad Request (UnicodeDecodeError)',
+                                           exc_info=sys.exc_info(),
+                                           extra={'status_code': 400,})
+                            response = HTTPResponse(status=401) #bad request
                         else:
-                            response = SanicDjangoAdaptorResponse(django_response)
-                    # Fetch handler from router
-                if isawaitable(response):
-                    response = await response
-        except Exception as e:
-            # -------------------------------------------- #
-            # Response Generation Failed
-            # -------------------------------------------- #
-
-            try:
-                response = self.app.error_handler.response(request, e)
-                if isawaitable(response):
-                    response = await response
+                            get_response = self._async_get_django_response(django_request, fast_path, fast_path_kwargs)
+                            deadline = self.deadline_for(request.path)
+                            try:
+                                if deadline is None and not self.disconnect_poll_interval:
+                                    django_response = await get_response
+                                else:
+                                    django_response = await self.run_with_deadline(request, get_response, deadline)
+                            except RequestDeadlineExceeded:
+                                logger.warning('Gateway Timeout (deadline of %.3fs exceeded): %s', deadline, request.path,
+                                               extra={'status_code': 504})
+                                response = HTTPResponse("Gateway Timeout", status=504)
+                            else:
+                                if django_response.streaming:
+                                    response = SanicDjangoAdaptorStreamingResponse(django_response)
+                                else:
+                                    response = SanicDjangoAdaptorResponse(django_response)
+                        # Fetch handler from router
+                    if isawaitable(response):
+                        response = await response
+            except asyncio.CancelledError:
+                # The client has gone away, nobody will read a response.
+                cancelled = True
+                raise
             except Exception as e:
-                if self.app.debug:
-                    response = HTTPResponse(
-                        "Error while handling error: {}\nStack: {}".format(
-                            e, format_exc()))
+                # -------------------------------------------- #
+                # Response Generation Failed
+                # -------------------------------------------- #
+
+                try:
+                    response = self.app.error_handler.response(request, e)
+                    if isawaitable(response):
+                        response = await response
+                except Exception as e:
+                    if self.app.debug:
+                        response = HTTPResponse(
+                            "Error while handling error: {}\nStack: {}".format(
+                                e, format_exc()))
+                    else:
+                        response = HTTPResponse(
+                            "An error occurred while handling an error")
+            finally:
+                # -------------------------------------------- #
+                # Response Middleware
+                # -------------------------------------------- #
+                if not cancelled:
+                    try:
+                        response = await self.app._run_response_middleware(request, response)
+                    except Exception:
+                        logger.exception(
+                            'Exception occured in one of response middleware handlers'
+                        )
+
+            # pass the response to the correct callback
+            if isinstance(response, StreamingHTTPResponse):
+                await stream_callback(response)
+            else:
+                write_callback(response)
+
+            # The response is written, now finish off the Django response and start any work the view deferred.
+            if django_response is not None:
+                if django_version >= (3, 1, 0):
+                    await self.async_close_response(django_response)
                 else:
-                    response = HTTPResponse(
-                        "An error occurred while handling an error")
+                    self.close_response(django_response)
+
+        # Outside the request's thread-sensitive context, which is gone by the time deferred work runs.
+        if django_request is not None and django_request.background_tasks:
+            if django_response is not None and django_response.status_code < 500:
+                for task in django_request.background_tasks:
+                    try:
+                        self.background.submit(task)
+                    except BackgroundQueueFull:
+                        logger.error('Dropped background task %r, the queue is full.', task)
+            else:
+                # The view failed or ran out of time, so its work may have been rolled back.
+                for task in django_request.background_tasks:
+                    logger.debug('Dropped background task %r, the view did not succeed.', task)
+                    if isawaitable(task.fn):
+                        task.fn.close()  # Avoid a "coroutine was never awaited" warning.
+
+        return response, django_request
+
+    async def _async_get_django_response(self, django_request, fast_path=None, fast_path_kwargs=None):
+        if fast_path is None:
+            get_response = self.async_get_response(django_request)
+        else:
+            get_response = fast_path.async_get_response(django_request, fast_path_kwargs)
+        if self.stall_detector is None:
+            return await get_response
+        self.stall_detector.enter(django_request)
+        try:
+            return await get_response
+        finally:
+            self.stall_detector.exit()
+
+    def deadline_for(self, path):
+        """The deadline in seconds for requests to `path`, or None."""
+        for prefix, deadline in self.route_deadlines:
+            if path.startswith(prefix):
+                return deadline
+        return self.request_deadline
+
+    async def run_with_deadline(self, request, coro, deadline):
+        """
+        Await `coro`, cancelling it if it is still running after `deadline`
+        seconds, or when the client disconnects. Cancellation reaches the view
+        coroutine, and any executor work it awaits which has not started yet.
+
+        :raises RequestDeadlineExceeded: If the deadline passed.
+        :raises asyncio.CancelledError: If the client disconnected.
+        """
+        loop = asyncio.get_event_loop()
+        task = asyncio.ensure_future(coro)
+        end = None if deadline is None else loop.time() + deadline
+        try:
+            while True:
+                timeout = self.disconnect_poll_interval or None
+                if end is not None:
+                    remaining = max(0.0, end - loop.time())
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                done, _ = await asyncio.wait([task], timeout=timeout)
+                if done:
+                    return task.result()
+                if end is not None and loop.time() >= end:
+                    raise RequestDeadlineExceeded()
+                transport = request.transport
+                if transport is None or transport.is_closing():
+                    logger.info('Client disconnected, cancelling: %s', request.path)
+                    raise asyncio.CancelledError()
         finally:
-            # -------------------------------------------- #
-            # Response Middleware
-            # -------------------------------------------- #
+            if not task.done():
+                task.cancel()
+
+    def _close_response_resources(self, response):
+        closers = getattr(response, '_resource_closers', None)  # Django >= 3.0
+        if closers is None:
+            closers = [closable.close for closable in response._closable_objects]
+        for closer in closers:
             try:
-                response = await self.app._run_response_middleware(request, response)
+                closer()
             except Exception:
-                logger.exception(
-                    'Exception occured in one of response middleware handlers'
-                )
+                pass
+        response.closed = True
 
-        # pass the response to the correct callback
-        if isinstance(response, StreamingHTTPResponse):
-            await stream_callback(response)
+    def close_response(self, response):
+        """
+        Do what HttpResponse.close() does: close the response's resources and send
+        request_finished. Called once the response has been written.
+        """
+        self._close_response_resources(response)
+        self.signals.send(signals.request_finished, self.__class__, robust=True)
+
+    async def async_close_response(self, response):
+        """
+        As close_response(), but sync request_finished receivers run in Django's
+        thread-sensitive executor, which owns the database connections on Django >= 3.1.
+        """
+        self._close_response_resources(response)
+        await self.signals.asend(signals.request_finished, self.__class__, robust=True)
+
+    @property
+    def in_flight(self):
+        """The number of requests being handled."""
+        return len(self._in_flight)
+
+    async def __call__(self, request, write_callback, stream_callback):
+        """
+        Handle a request from the Sanic server, see _handle_request().
+        """
+        if self.draining:
+            self._reject_while_draining(request, write_callback)
+            return
+        if self.recorder is not None:
+            self.recorder.record(request)
+        self._in_flight[id(request)] = request
+        try:
+            if self.metrics is None:
+                await self._handle_request(request, write_callback, stream_callback)
+                return
+            start = time.perf_counter()
+            self.metrics.request_started()
+            response = django_request = status = None
+            try:
+                response, django_request = await self._handle_request(request, write_callback, stream_callback)
+            except asyncio.CancelledError:
+                status = ABANDONED_STATUS
+                django_request = request.get(DJANGO_REQUEST_KEY)
+                raise
+            finally:
+                if status is None:
+                    status = getattr(response, 'status', 500)
+                size = getattr(response, 'bytes_written', None)  # A streaming response.
+                if size is None:
+                    size = len(getattr(response, 'body', None) or b'')
+                self.metrics.request_finished(route_label(request, django_request), status,
+                                              time.perf_counter() - start, size)
+        finally:
+            del self._in_flight[id(request)]
+            if self.draining:
+                if not self._stop_keep_alive(request) and request.transport is not None:
+                    # Not a Sanic HttpProtocol's connection, so close it after the fact.
+                    request.transport.close()
+                if not self.in_flight and self._drained is not None:
+                    self._drained.set()
+
+    def _reject_while_draining(self, request, write_callback):
+        closing = self._stop_keep_alive(request)
+        write_callback(HTTPResponse("Service Unavailable", status=503, headers={'Retry-After': '1'}))
+        if not closing and request.transport is not None:
+            request.transport.close()
+
+    @staticmethod
+    def _stop_keep_alive(request):
+        """
+        Have the Sanic server close the connection of `request` once its
+        response is written, so the client reconnects to a worker which isn't
+        stopping. Return False if the connection is not a Sanic HttpProtocol's.
+        """
+        get_protocol = getattr(request.transport, 'get_protocol', None)
+        protocol = get_protocol() if get_protocol is not None else None
+        if not hasattr(protocol, '_keep_alive'):
+            return False
+        protocol._keep_alive = False
+        return True
+
+    async def drain(self, timeout=None):
+        """
+        Stop taking new requests, and wait up to `timeout` seconds for
+        in-flight requests (including streaming responses) and then background
+        tasks to finish. Finally close this worker's database connections.
+
+        In-flight responses are sent with "Connection: close", and requests
+        arriving on a kept-alive connection while draining get a 503. Requests
+        still in flight when the drain times out have their connection closed.
+        """
+        self.draining = True
+        loop = asyncio.get_event_loop()
+        end = None if timeout is None else loop.time() + timeout
+        if self.in_flight:
+            logger.info('Draining %d in-flight requests.', self.in_flight)
+            for request in self._in_flight.values():
+                self._stop_keep_alive(request)
+            self._drained = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning('%d requests were still in flight when the drain timed out.', self.in_flight)
+                for request in list(self._in_flight.values()):
+                    if request.transport is not None:
+                        request.transport.close()
+        await self.background.drain(None if end is None else max(0.0, end - loop.time()))
+        if django_version >= (3, 1, 0):
+            # Connections belong to the thread-sensitive executor, and Django refuses to close them on the loop.
+            try:
+                await asyncio.wait_for(sync_to_async(self._close_connections, thread_sensitive=True)(),
+                                       None if end is None else max(0.0, end - loop.time()))
+            except asyncio.TimeoutError:
+                logger.warning('The database connections were not closed before the drain timed out.')
         else:
-            write_callback(response)
+            self._close_connections()
+
+    @staticmethod
+    def _close_connections():
+        for connection in connections.all():
+            connection.close()
 
 
 def get_sanic_application():
@@ -569,7 +906,46 @@ def get_sanic_application():
         static_url = getattr(settings, 'STATIC_URL', "/static/")
         static_root = getattr(settings, 'STATIC_ROOT', "./static")
         app.static(static_url, static_root)
-    app.handle_request = SanicHandler(app)  # patch the app to use the django adaptor handler
+    handler = SanicHandler(app)
+    app.handle_request = handler  # patch the app to use the django adaptor handler
+    mount_fast_paths(handler)
+
+    if handler.metrics is not None:
+        # The metrics segment is created before the workers are forked, so each worker serves the totals of all of them.
+        def metrics_view(request):
+            return HTTPResponse(handler.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+        app.add_route(metrics_view, getattr(settings, 'SANIC_ADAPTOR_METRICS_URL', '/metrics'))
+
+    drain = []
+
+    # Sanic closes the listening socket only once the before_server_stop listeners have returned, so
+    # the drain runs alongside Sanic's own wait for open connections, rather than answering new ones with 503s.
+    @app.listener('before_server_stop')
+    def start_draining(app, loop):
+        handler.draining = True
+        drain.append(loop.create_task(handler.drain(getattr(settings, 'SANIC_ADAPTOR_DRAIN_TIMEOUT', 30.0))))
+
+    @app.listener('after_server_stop')
+    async def finish_draining(app, loop):
+        if drain:
+            await drain.pop()
+
+    if handler.stall_detector is not None:
+        @app.listener('before_server_start')
+        def start_stall_detector(app, loop):
+            handler.stall_detector.start(loop)
+
+        @app.listener('after_server_stop')
+        def stop_stall_detector(app, loop):
+            handler.stall_detector.stop()
+            if handler.stall_detector.stalls:
+                logger.warning('Event loop stalls by view:\n%s', handler.stall_detector.format_report())
+
+    if handler.recorder is not None:
+        @app.listener('after_server_stop')
+        def close_traffic_recorder(app, loop):
+            handler.recorder.close()
+
     return app
 
 
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger('django_sanic_adaptor.stalls')
+
+try:
+    _current_task = asyncio.current_task
+except AttributeError:  # Python < 3.7
+    _current_task = asyncio.Task.current_task
+
+
+class StallRecord(object):
+    __slots__ = ('view', 'middleware', 'count', 'total', 'worst', 'stack')
+
+    def __init__(self, view, middleware):
+        self.view = view
+        self.middleware = middleware
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.stack = None
+
+
+class StallDetector(object):
+    """
+    Watchdog which detects when the event loop has not run for longer than
+    `threshold` seconds. This happens when synchronous Django code blocks the
+    loop. The detector captures the loop thread's stack and attributes the
+    stall to the view and middleware of the request which was running.
+
+    The loop bumps a heartbeat every `interval` seconds, and a daemon thread
+    checks how old the heartbeat is.
+    """
+
+    def __init__(self, threshold=0.1, interval=None, middleware_modules=()):
+        """
+        :param float threshold: Seconds the loop may block before it counts as a stall.
+        :param float interval: Heartbeat interval in seconds, defaults to a quarter of the threshold.
+        :param middleware_modules: Module names of the installed middleware, used for attribution.
+        """
+        self.threshold = threshold
+        self.interval = interval or threshold / 4.0
+        self.middleware_modules = tuple(middleware_modules)
+        self.stalls = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread_id = None
+        self._heartbeat = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @classmethod
+    def from_settings(cls, settings):
+        threshold = getattr(settings, 'SANIC_ADAPTOR_STALL_THRESHOLD', None)
+        if not threshold:
+            return None
+        middleware = getattr(settings, 'MIDDLEWARE', None)
+        if middleware is None:
+            middleware = getattr(settings, 'MIDDLEWARE_CLASSES', ())
+        return cls(threshold, middleware_modules=[m.rpartition('.')[0] for m in middleware])
+
+    def start(self, loop):
+        """Start watching `loop`. Must be called from the loop's own thread."""
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        loop.call_soon(self._beat)
+        self._thread = threading.Thread(target=self._watch, name='sanic-stall-detector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self.interval * 2)
+            self._thread = None
+
+    def enter(self, request):
+        """Record that the current task is handling the Django `request`."""
+        task = _current_task(self._loop)
+        if task is not None:
+            self._requests[task] = request
+
+    def exit(self):
+        task = _current_task(self._loop)
+        if task is not None:
+            self._requests.pop(task, None)
+
+    def _beat(self):
+        self._heartbeat = time.monotonic()
+        if not self._stopped.is_set():
+            self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat
+            if blocked < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            if reported is not None and reported[0] == heartbeat:
+                # Still the same stall, just keep its duration up to date.
+                reported[1].total += blocked - reported[2]
+                reported[1].worst = max(reported[1].worst, blocked)
+                reported = (heartbeat, reported[1], blocked)
+                continue
+            stack = traceback.extract_stack(frame)
+            record = self._record(stack, blocked)
+            reported = (heartbeat, record, blocked)
+            logger.warning('Event loop blocked for at least %.3fs in view %s (middleware: %s)\n%s',
+                           blocked, record.view, record.middleware or '-', ''.join(traceback.format_list(stack)))
+
+    def _record(self, stack, blocked):
+        request = None
+        try:
+            task = _current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is not None:
+            request = self._requests.get(task)
+        view = '<unknown>'
+        if request is not None:
+            match = getattr(request, 'resolver_match', None)
+            if match is not None:
+                view = match.view_name or getattr(match.func, '__name__', repr(match.func))
+            else:
+                view = 'unresolved {:s}'.format(request.path)
+        middleware = None
+        for entry in reversed(stack):
+            module = _module_name(entry.filename)
+            if module is not None and module in self.middleware_modules:
+                middleware = module
+                break
+        with self._lock:
+            record = self.stalls.get((view, middleware))
+            if record is None:
+                record = self.stalls[(view, middleware)] = StallRecord(view, middleware)
+            record.count += 1
+            record.total += blocked
+            record.worst = max(record.worst, blocked)
+            record.stack = stack
+        return record
+
+    def report(self):
+        """Return the recorded stalls, the worst offenders by total blocked time first."""
+        with self._lock:
+            records = list(self.stalls.values())
+        return sorted(records, key=lambda r: r.total, reverse=True)
+
+    def format_report(self):
+        lines = ["{:>6s} {:>9s} {:>9s}  {:s}".format('stalls', 'total', 'worst', 'view (middleware)')]
+        for record in self.report():
+            lines.append("{:6d} {:8.3f}s {:8.3f}s  {:s}{:s}".format(
+                record.count, record.total, record.worst, record.view,
+                ' ({:s})'.format(record.middleware) if record.middleware else ''))
+        return '\n'.join(lines)
+
+
+_module_names = {}
+
+
+def _module_name(filename):
+    """Find the name of the loaded module a stack entry's file belongs to."""
+    try:
+        return _module_names[filename]
+    except KeyError:
+        pass
+    module = None
+    for name, mod in list(sys.modules.items()):
+        if getattr(mod, '__file__', None) == filename:
+            module = name
+            break
+    _module_names[filename] = module
+    return module
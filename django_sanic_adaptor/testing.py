@@ -0,0 +1,270 @@
+"""
+An in-process client for testing Django applications served by the adaptor.
+
+Requests are fabricated the way the Sanic server builds them from the wire
+and handed straight to the SanicHandler, so they run the same code path as
+production traffic, with no socket and no server process:
+
+    client = AdaptorClient()
+    response = client.run(client.get('/polls/'))
+    assert response.status == 200
+
+Requests are coroutines, so tests can run many of them concurrently on one
+loop to exercise interleaving, and every response records when it started
+and finished.
+"""
+import asyncio
+import json as jsonlib
+import time
+
+try:
+    import sanic
+    from sanic.request import Request as SanicRequest
+    try:
+        from sanic.server import CIDict
+    except ImportError:
+        CIDict = dict
+except ImportError:
+    print("Sanic is not installed. Please install it before using this library.")
+    SanicRequest = object
+    CIDict = dict
+
+
+class FakeTransport(object):
+    """
+    Stands in for the asyncio transport of a client connection.
+
+    :param bool capture: Keep everything written, not just count the bytes.
+    """
+
+    def __init__(self, capture=False):
+        self.written = 0
+        self.data = bytearray() if capture else None
+        self.closed = False
+
+    def get_extra_info(self, name, default=None):
+        if name == 'peername':
+            return ('127.0.0.1', 0)
+        return default
+
+    def write(self, data):
+        self.written += len(data)
+        if self.data is not None:
+            self.data += data
+
+    def close(self):
+        self.closed = True
+
+    def is_closing(self):
+        return self.closed
+
+
+def make_sanic_request(app, method, path, headers=None, body=b'', transport=None):
+    """
+    Fabricate a Sanic request object, as the Sanic server would build one from the wire.
+    """
+    # CIDict only folds the case of keys set one at a time.
+    cidict = CIDict()
+    for (name, value) in (headers or {}).items():
+        cidict[name] = value
+    headers = cidict
+    if body and 'content-length' not in headers:
+        headers['Content-Length'] = str(len(body))
+    request_class = getattr(app, 'request_class', None) or SanicRequest
+    request = request_class(path.encode('utf-8'), headers, '1.1', method.upper(),
+                            transport or FakeTransport())
+    request.body = body
+    return request
+
+
+class ClientResponse(object):
+    """
+    The response to one request made with AdaptorClient.
+
+    `status` is None if the handler never responded, for instance when the
+    request was disconnected before the view finished.
+    """
+
+    def __init__(self, request, response, body, streamed, started, responded, finished):
+        self.request = request
+        self.response = response
+        self.status = getattr(response, 'status', None)
+        headers = getattr(response, 'headers', None) or {}
+        # Sanic keeps cookies in the same dict, under one key object per Set-Cookie header.
+        self.header_items = [(str(name), str(value)) for (name, value) in headers.items()]
+        content_type = getattr(response, 'content_type', None)
+        if content_type and not any(name.lower() == 'content-type' for (name, _) in self.header_items):
+            # Sanic only adds the Content-Type header as the response is written to the wire.
+            self.header_items.append(('Content-Type', content_type))
+        self.headers = CIDict()
+        for (name, value) in self.header_items:
+            self.headers[name] = value
+        self.body = body
+        self.streamed = streamed
+        self.started = started
+        self.responded = responded
+        self.finished = finished
+
+    @property
+    def elapsed(self):
+        """Seconds from handing the request to the handler until the handler returned."""
+        return self.finished - self.started
+
+    @property
+    def time_to_response(self):
+        """Seconds until the response headers were written, or None if they never were."""
+        return None if self.responded is None else self.responded - self.started
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8')
+
+    def json(self):
+        return jsonlib.loads(self.text)
+
+    @property
+    def cookies(self):
+        """The Set-Cookie headers of the response, as a list of header values."""
+        return [value for (name, value) in self.header_items if name.lower() == 'set-cookie']
+
+    def __repr__(self):
+        return '<ClientResponse {} {}>'.format(self.status, self.request.path)
+
+
+class AdaptorClient(object):
+    """
+    Drives a Sanic application's SanicHandler in-process.
+
+    :param app: A Sanic application from get_sanic_application(), by default a new one.
+    :param dict headers: Headers sent with every request.
+    """
+
+    def __init__(self, app=None, headers=None):
+        if app is None:
+            from django_sanic_adaptor.sanic_application import get_sanic_application
+            app = get_sanic_application()
+        self.app = app
+        self.handler = app.handle_request
+        self.headers = {'Host': 'testserver'}
+        self.headers.update(headers or {})
+
+    async def request(self, method, path, headers=None, body=b'', json=None, disconnect_after=None):
+        """
+        Send one request through the handler and return its ClientResponse.
+
+        :param str method: HTTP method.
+        :param str path: Path, with the query string if any.
+        :param dict headers: Extra request headers.
+        :param body: Request body, bytes or str.
+        :param json: Send this object as a JSON request body instead of `body`.
+        :param float disconnect_after: Close the client connection after this many seconds.
+        """
+        all_headers = dict(self.headers)
+        all_headers.update(headers or {})
+        if json is not None:
+            body = jsonlib.dumps(json)
+            all_headers.setdefault('Content-Type', 'application/json')
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        transport = FakeTransport(capture=True)
+        request = make_sanic_request(self.app, method, path, all_headers, body, transport)
+        captured = {}
+
+        def _write(response):
+            captured['response'] = response
+            captured['responded'] = time.perf_counter()
+
+        async def _stream(response):
+            captured['response'] = response
+            captured['responded'] = time.perf_counter()
+            captured['streamed'] = True
+            response.transport = transport
+            await response.stream()
+
+        disconnect = None
+        if disconnect_after is not None:
+            disconnect = asyncio.get_event_loop().call_later(disconnect_after, transport.close)
+        started = time.perf_counter()
+        try:
+            await self.handler(request, _write, _stream)
+        except asyncio.CancelledError:
+            # The handler abandons a request whose client went away. Anything else is a real cancellation.
+            if not transport.closed:
+                raise
+        finally:
+            finished = time.perf_counter()
+            if disconnect is not None:
+                disconnect.cancel()
+
+        response = captured.get('response')
+        streamed = captured.get('streamed', False)
+        if streamed:
+            body = _dechunk(bytes(transport.data))
+        else:
+            body = getattr(response, 'body', None) or b''
+        return ClientResponse(request, response, body, streamed, started, captured.get('responded'), finished)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def head(self, path, **kwargs):
+        return self.request('HEAD', path, **kwargs)
+
+    def options(self, path, **kwargs):
+        return self.request('OPTIONS', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    async def gather(self, *requests, concurrency=None):
+        """
+        Run request coroutines concurrently, at most `concurrency` at once,
+        and return their ClientResponses in the order given.
+        """
+        if concurrency is None:
+            return list(await asyncio.gather(*requests))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _limited(coro):
+            async with semaphore:
+                return await coro
+
+        return list(await asyncio.gather(*[_limited(coro) for coro in requests]))
+
+    async def wait_for_background(self, timeout=None):
+        """
+        Wait for the background tasks scheduled by earlier requests to finish.
+
+        :return: The number of tasks which were cancelled after `timeout` seconds.
+        """
+        return await self.handler.background.drain(timeout)
+
+    def run(self, coro):
+        """Run `coro` to completion, for tests which are not coroutines themselves."""
+        return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _dechunk(data):
+    """Return the body of a chunked HTTP response, given the full response bytes."""
+    _, _, data = data.partition(b'\r\n\r\n')
+    body = bytearray()
+    position = 0
+    while True:
+        end = data.find(b'\r\n', position)
+        if end < 0:
+            break
+        size = int(data[position:end].split(b';', 1)[0], 16)
+        if not size:
+            break
+        body += data[end + 2:end + 2 + size]
+        position = end + 2 + size + 2
+    return bytes(body)
@@ -0,0 +1,32 @@
+import logging
+import unittest
+
+from django_sanic_adaptor.testing import AdaptorClient
+
+_client = None
+
+
+def get_client():
+    """The client of the one Sanic application shared by all the tests."""
+    global _client
+    if _client is None:
+        _client = AdaptorClient()
+        # Sanic's default logging config disables the loggers which already exist, Django's among them.
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger):
+                logger.disabled = False
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    return _client
+
+
+class AdaptorTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(AdaptorTestCase, cls).setUpClass()
+        cls.client = get_client()
+        cls.handler = cls.client.handler
+
+    def run_async(self, coro):
+        return self.client.run(coro)
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='django-sanic-adaptor-tests-')
+
+SECRET_KEY = 'django-sanic-adaptor-tests'
+DEBUG = False
+ALLOWED_HOSTS = ['testserver']
+ROOT_URLCONF = 'tests.urls'
+USE_TZ = True
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.auth',
+]
+MIDDLEWARE = [
+    'django.middleware.common.CommonMiddleware',
+]
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        # A file, as sync views and the test setup use connections from different threads.
+        'NAME': os.path.join(TEST_DIR, 'db.sqlite3'),
+    }
+}
+
+SANIC_ADAPTOR_METRICS = True
+SANIC_ADAPTOR_ROUTE_DEADLINES = {'/deadline/': 0.2}
+SANIC_ADAPTOR_DISCONNECT_POLL_INTERVAL = 0.01
+SANIC_ADAPTOR_FAST_PATH_PREFIXES = {'/prefix/': ['django.middleware.common.CommonMiddleware']}
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from django_sanic_adaptor.background import BackgroundTaskRunner
+from tests import views
+from tests.base import AdaptorTestCase
+
+
+class BackgroundTaskRunnerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.errors = []
+        self.retries = []
+        self.runner = BackgroundTaskRunner(retries=2, on_retry=lambda task, exc: self.retries.append(exc),
+                                           on_error=lambda task, exc: self.errors.append(exc))
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_tasks(self, *tasks):
+        async def _run():
+            for task in tasks:
+                self.runner.schedule(task)
+            await self.runner.drain(1.0)
+        self.loop.run_until_complete(_run())
+
+    def test_coroutine_object_is_not_retried(self):
+        async def fail():
+            raise ValueError('boom')
+
+        with self.assertLogs('django.request', 'ERROR'):
+            self.run_tasks(fail())
+        self.assertEqual(self.retries, [])
+        self.assertEqual(len(self.errors), 1)
+        self.assertIsInstance(self.errors[0], ValueError)
+
+    def test_coroutine_object_with_explicit_retries(self):
+        async def noop():
+            pass
+
+        coro = noop()
+        with self.assertRaises(ValueError):
+            self.runner.make_task(coro, retries=1)
+        coro.close()
+
+    def test_coroutine_function_is_retried(self):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ValueError('flaky')
+            return 'done'
+
+        with self.assertLogs('django.request', 'WARNING'):
+            self.run_tasks(flaky)
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(len(self.retries), 2)
+        self.assertEqual(self.errors, [])
+
+
+class RunAfterResponseTests(AdaptorTestCase):
+
+    def setUp(self):
+        del views.BACKGROUND_CALLS[:]
+
+    def request(self, path):
+        response = self.run_async(self.client.get(path))
+        self.run_async(self.client.wait_for_background(1.0))
+        return response
+
+    def test_runs_after_success(self):
+        self.assertEqual(self.request('/background/ok/').status, 200)
+        self.assertEqual(views.BACKGROUND_CALLS, ['ok'])
+
+    def test_dropped_when_view_raises(self):
+        with self.assertLogs('django.request', 'ERROR'):
+            self.assertEqual(self.request('/background/raise/').status, 500)
+        self.assertEqual(views.BACKGROUND_CALLS, [])
+
+    def test_dropped_on_server_error_response(self):
+        with self.assertLogs('django.request', 'ERROR'):
+            self.assertEqual(self.request('/background/error/').status, 503)
+        self.assertEqual(views.BACKGROUND_CALLS, [])
+
+    def test_dropped_on_deadline(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.request('/deadline/background/').status, 504)
+        self.assertEqual(views.BACKGROUND_CALLS, [])
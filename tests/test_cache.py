@@ -0,0 +1,129 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from django_sanic_adaptor.cache import SharedMemoryCache
+
+import tests  # noqa, configures Django
+
+
+class SharedMemoryCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(prefix='django-sanic-adaptor-cache-')
+        os.close(fd)
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def make_cache(self, **options):
+        options.setdefault('SLOTS', 16)
+        options.setdefault('SLOT_SIZE', 256)
+        options.setdefault('SET_SIZE', 2)
+        return SharedMemoryCache(self.path, {'OPTIONS': options})
+
+    def test_set_get(self):
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(self.cache.get('key'), {'value': 1})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+
+    def test_shared_between_instances(self):
+        self.cache.set('key', 'shared')
+        self.assertEqual(self.make_cache().get('key'), 'shared')
+
+    def test_add_and_delete(self):
+        self.assertTrue(self.cache.add('key', 1))
+        self.assertFalse(self.cache.add('key', 2))
+        self.assertEqual(self.cache.get('key'), 1)
+        self.assertTrue(self.cache.delete('key'))
+        self.assertFalse(self.cache.has_key('key'))
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.incr('counter', 10), 12)
+        self.assertEqual(self.cache.get('counter'), 12)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_expiry(self):
+        self.cache.set('key', 1, timeout=-1)
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', 1)
+        self.assertTrue(self.cache.touch('key', -1))
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_evicts_least_recently_used(self):
+        # Find three keys which hash to the same two-slot set.
+        _, target = self.cache._hash(self.cache.make_key('k0').encode('utf-8'))
+        keys = [k for k in ('k{:d}'.format(i) for i in range(1000))
+                if self.cache._hash(self.cache.make_key(k).encode('utf-8'))[1] == target][:3]
+        first, second, third = keys
+        self.cache.set(first, 1)
+        self.cache.set(second, 2)
+        self.cache.get(first)
+        self.cache.set(third, 3)
+        self.assertEqual(self.cache.get(first), 1)
+        self.assertIsNone(self.cache.get(second))
+        self.assertEqual(self.cache.get(third), 3)
+
+    def test_too_big_for_a_slot(self):
+        self.cache.set('key', 'small')
+        self.cache.set('key', 'x' * 1000)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_layout_mismatch(self):
+        self.cache.set('key', 1)
+        with self.assertRaises(ImproperlyConfigured):
+            self.make_cache(SLOTS=32).get('key')
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_instances_share_thread_locks(self):
+        # Django makes one cache backend per thread, all of them using the same file.
+        other = self.make_cache()
+        _, set_offset = self.cache._hash(b'key')
+        entered = threading.Event()
+
+        def _lock_from_other_thread():
+            with other._locked(set_offset):
+                entered.set()
+
+        with self.cache._locked(set_offset):
+            thread = threading.Thread(target=_lock_from_other_thread)
+            thread.start()
+            self.assertFalse(entered.wait(0.2))
+        thread.join(1.0)
+        self.assertTrue(entered.is_set())
+
+    def test_concurrent_increments_from_threads(self):
+        self.cache.set('counter', 0)
+
+        def _increment():
+            cache = self.make_cache()
+            for _ in range(200):
+                cache.incr('counter')
+
+        threads = [threading.Thread(target=_increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 800)
+
+    def test_shared_with_forked_process(self):
+        self.cache.set('key', 'parent')
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = self.cache.get('key') == 'parent'
+                self.cache.set('key', 'child')
+            finally:
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        self.assertEqual(self.cache.get('key'), 'child')
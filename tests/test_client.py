@@ -0,0 +1,42 @@
+from tests.base import AdaptorTestCase
+
+
+class AdaptorClientTests(AdaptorTestCase):
+
+    def test_sync_view(self):
+        response = self.run_async(self.client.get('/hello/?name=sanic'))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.text, 'hello sanic')
+        self.assertEqual(response.headers['content-type'], 'text/html; charset=utf-8')
+        self.assertFalse(response.streamed)
+
+    def test_async_view(self):
+        response = self.run_async(self.client.get('/async/'))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json(), {'async': True})
+
+    def test_streaming_view(self):
+        response = self.run_async(self.client.get('/stream/'))
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.streamed)
+        self.assertEqual(response.body, b'first second')
+
+    def test_not_found(self):
+        response = self.run_async(self.client.get('/missing/'))
+        self.assertEqual(response.status, 404)
+
+    def test_concurrent_requests_interleave(self):
+        responses = self.run_async(self.client.gather(
+            self.client.get('/sleep/200/'), self.client.get('/sleep/10/')))
+        self.assertEqual([r.status for r in responses], [200, 200])
+        slow, fast = responses
+        # The short request finished while the long one was still waiting.
+        self.assertLess(fast.finished, slow.finished)
+        self.assertLess(slow.elapsed, 0.2 + 0.15)
+
+    def test_concurrency_limit(self):
+        responses = self.run_async(self.client.gather(
+            *[self.client.get('/sleep/50/') for _ in range(4)], concurrency=2))
+        self.assertEqual([r.status for r in responses], [200] * 4)
+        starts = sorted(r.started for r in responses)
+        self.assertGreaterEqual(starts[2] - starts[0], 0.04)
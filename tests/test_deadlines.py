@@ -0,0 +1,36 @@
+from tests.base import AdaptorTestCase
+
+
+class DeadlineTests(AdaptorTestCase):
+
+    def abandoned_count(self):
+        for line in self.handler.metrics.render().splitlines():
+            if line.startswith('sanic_adaptor_requests_total{route="deadline",status="abandoned"}'):
+                return int(line.rsplit(' ', 1)[1])
+        return 0
+
+    def test_within_deadline(self):
+        response = self.run_async(self.client.get('/deadline/10/'))
+        self.assertEqual(response.status, 200)
+
+    def test_deadline_exceeded(self):
+        response = self.run_async(self.client.get('/deadline/2000/'))
+        self.assertEqual(response.status, 504)
+        self.assertLess(response.elapsed, 1.0)
+
+    def test_hung_sync_view(self):
+        hung = self.run_async(self.client.get('/deadline/hang/'))
+        self.assertEqual(hung.status, 504)
+        self.assertLess(hung.elapsed, 0.5)
+        # Sync code of other requests doesn't queue behind the view still running in its thread.
+        quick = self.run_async(self.client.get('/users/'))
+        self.assertEqual(quick.status, 200)
+        self.assertLess(quick.elapsed, 0.5)
+
+    def test_disconnect(self):
+        before = self.abandoned_count()
+        response = self.run_async(self.client.get('/deadline/2000/', disconnect_after=0.05))
+        self.assertIsNone(response.status)
+        self.assertLess(response.elapsed, 0.15)
+        self.assertEqual(self.handler.in_flight, 0)
+        self.assertEqual(self.abandoned_count(), before + 1)
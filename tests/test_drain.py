@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from django_sanic_adaptor.testing import FakeTransport, make_sanic_request
+from tests.base import AdaptorTestCase
+
+
+class Protocol(object):
+    """The part of Sanic's HttpProtocol the drain uses."""
+
+    def __init__(self):
+        self._keep_alive = True
+
+
+class ProtocolTransport(FakeTransport):
+
+    def __init__(self):
+        super(ProtocolTransport, self).__init__()
+        self.protocol = Protocol()
+
+    def get_protocol(self):
+        return self.protocol
+
+
+class DrainTests(AdaptorTestCase):
+
+    def tearDown(self):
+        self.handler.draining = False
+        self.handler._drained = None
+
+    def test_drain(self):
+        async def scenario():
+            in_flight = asyncio.ensure_future(self.client.get('/sleep/100/'))
+            await asyncio.sleep(0.02)
+            drain = asyncio.ensure_future(self.handler.drain(5.0))
+            await asyncio.sleep(0)
+            rejected = await self.client.get('/hello/')
+            await drain
+            return await in_flight, rejected
+
+        finished, rejected = self.run_async(scenario())
+        self.assertEqual(finished.status, 200)
+        self.assertEqual(rejected.status, 503)
+        self.assertEqual(rejected.headers['Retry-After'], '1')
+        self.assertTrue(rejected.request.transport.closed)
+        self.assertEqual(self.handler.in_flight, 0)
+
+    def test_in_flight_response_stops_keep_alive(self):
+        transport = ProtocolTransport()
+        request = make_sanic_request(self.client.app, 'GET', '/sleep/50/', {'Host': 'testserver'}, transport=transport)
+        responses = []
+
+        async def scenario():
+            handled = asyncio.ensure_future(self.handler(request, responses.append, None))
+            await asyncio.sleep(0.02)
+            await self.handler.drain(5.0)
+            await handled
+
+        self.run_async(scenario())
+        self.assertEqual(responses[0].status, 200)
+        self.assertFalse(transport.protocol._keep_alive)
+        # Sanic closes the connection itself, after writing "Connection: close".
+        self.assertFalse(transport.closed)
+
+    def test_timeout_closes_in_flight_connections(self):
+        async def scenario():
+            in_flight = asyncio.ensure_future(self.client.get('/sleep/2000/'))
+            await asyncio.sleep(0.02)
+            await self.handler.drain(0.05)
+            return await in_flight
+
+        abandoned = self.run_async(scenario())
+        self.assertIsNone(abandoned.status)
+        self.assertTrue(abandoned.request.transport.closed)
+        self.assertLess(abandoned.elapsed, 1.0)
+        self.assertEqual(self.handler.in_flight, 0)
+
+    def test_listener_does_not_wait(self):
+        app = self.client.app
+        loop = asyncio.get_event_loop()
+        start_draining, = [l for l in app.listeners['before_server_stop'] if l.__name__ == 'start_draining']
+        finish_draining, = [l for l in app.listeners['after_server_stop'] if l.__name__ == 'finish_draining']
+        in_flight = asyncio.ensure_future(self.client.get('/sleep/100/'))
+        loop.run_until_complete(asyncio.sleep(0.02))
+        # Sanic stops listening once this returns, so it must not wait for the drain.
+        self.assertIsNone(start_draining(app, loop))
+        self.assertTrue(self.handler.draining)
+        self.assertEqual(self.handler.in_flight, 1)
+        loop.run_until_complete(finish_draining(app, loop))
+        self.assertEqual(self.handler.in_flight, 0)
+        self.assertEqual(loop.run_until_complete(in_flight).status, 200)
+
+    def test_closing_connections_is_limited_by_timeout(self):
+        from asgiref.sync import sync_to_async
+
+        async def scenario():
+            # Keep the thread which owns the connections busy.
+            busy = asyncio.ensure_future(sync_to_async(time.sleep, thread_sensitive=True)(0.5))
+            await asyncio.sleep(0.02)
+            start = time.perf_counter()
+            with self.assertLogs('django.request', 'WARNING'):
+                await self.handler.drain(0.05)
+            elapsed = time.perf_counter() - start
+            await busy
+            return elapsed
+
+        self.assertLess(self.run_async(scenario()), 0.3)
@@ -0,0 +1,33 @@
+import unittest
+
+import django
+
+from tests.base import AdaptorTestCase
+
+
+class FastPathTests(AdaptorTestCase):
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.get_or_create(username='fast')
+
+    def test_mounted_view(self):
+        response = self.run_async(self.client.get('/fast/users/'))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.text, '1')
+
+    def test_strict_slashes(self):
+        response = self.run_async(self.client.get('/fast/users'))
+        self.assertNotEqual(response.status, 200)
+
+    def test_prefix(self):
+        response = self.run_async(self.client.get('/prefix/users/'))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.text, '1')
+
+    @unittest.skipUnless(django.VERSION >= (3, 1), "Django < 3.1 has no async request path.")
+    def test_orm_matches_normal_path(self):
+        responses = self.run_async(self.client.gather(
+            self.client.get('/users/'), self.client.get('/fast/users/'), self.client.get('/prefix/users/')))
+        self.assertEqual([r.status for r in responses], [200, 200, 200])
+        self.assertEqual(len({r.text for r in responses}), 1)
@@ -0,0 +1,38 @@
+import unittest
+
+from django_sanic_adaptor.loadtest import REDACTED_VALUE, ReplayReport, _replay_headers, replay
+from tests.base import AdaptorTestCase
+
+
+class ReplayTests(AdaptorTestCase):
+
+    def test_replay(self):
+        records = [
+            {'t': 0.0, 'm': 'GET', 'p': '/hello/?name=replay', 'h': {'host': 'testserver'}, 'b': 0},
+            {'t': 0.1, 'm': 'GET', 'p': '/async/', 'h': {'host': 'testserver', 'cookie': REDACTED_VALUE}, 'b': 0},
+            {'t': 0.2, 'm': 'GET', 'p': '/missing/', 'h': {'host': 'testserver'}, 'b': 0},
+        ]
+        report = self.run_async(replay(self.client.app, records, concurrency=2, repeat=3))
+        self.assertEqual(report.count, 9)
+        self.assertEqual(report.statuses, {200: 6, 404: 3})
+        self.assertEqual(report.errors, 0)
+        self.assertGreater(report.throughput, 0)
+        self.assertIn('Requests:   9', report.format())
+
+    def test_redacted_headers_are_not_replayed(self):
+        recorded = {'host': 'testserver', 'cookie': REDACTED_VALUE, 'authorization': REDACTED_VALUE}
+        self.assertEqual(_replay_headers(recorded, None), {'host': 'testserver'})
+        self.assertEqual(_replay_headers(recorded, {'Cookie': 'sessionid=test'}),
+                         {'host': 'testserver', 'Cookie': 'sessionid=test'})
+
+
+class ReplayReportTests(unittest.TestCase):
+
+    def test_percentiles_and_histogram(self):
+        report = ReplayReport([0.001 * i for i in range(1, 101)], {200: 99, 'exception': 1}, 1, 2.0)
+        self.assertEqual(report.throughput, 50.0)
+        self.assertEqual(report.error_rate, 0.01)
+        self.assertAlmostEqual(report.percentile(50), 0.051)
+        self.assertAlmostEqual(report.percentile(100), 0.1)
+        self.assertEqual(sum(count for (_, count) in report.histogram()), 100)
+        self.assertIn('exception: 1', report.format())
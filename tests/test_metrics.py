@@ -0,0 +1,107 @@
+import os
+import unittest
+
+from django_sanic_adaptor.metrics import ABANDONED_STATUS, Metrics
+from tests.base import AdaptorTestCase
+
+
+def samples(text):
+    """Parse Prometheus text into {sample name with labels: value}."""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+class MetricsTests(unittest.TestCase):
+
+    def test_render(self):
+        metrics = Metrics(max_routes=8, max_workers=2, buckets=(0.1, 1.0))
+        metrics.request_started()
+        metrics.request_finished('hello', 200, 0.05, 10)
+        metrics.request_started()
+        metrics.request_finished('hello', 201, 0.5, 20)
+        metrics.request_started()
+        metrics.request_finished('hello', 404, 2.0, 5)
+        metrics.request_started()
+        metrics.request_finished('hello', ABANDONED_STATUS, 0.2, 0)
+        metrics.request_started()
+        values = samples(metrics.render())
+        self.assertEqual(values['sanic_adaptor_requests_in_flight'], 1)
+        self.assertEqual(values['sanic_adaptor_requests_total{route="hello",status="2xx"}'], 2)
+        self.assertEqual(values['sanic_adaptor_requests_total{route="hello",status="4xx"}'], 1)
+        self.assertEqual(values['sanic_adaptor_requests_total{route="hello",status="abandoned"}'], 1)
+        self.assertEqual(values['sanic_adaptor_response_size_bytes_total{route="hello",status="2xx"}'], 30)
+        self.assertEqual(values['sanic_adaptor_request_duration_seconds_bucket{route="hello",status="2xx",le="0.1"}'], 1)
+        self.assertEqual(values['sanic_adaptor_request_duration_seconds_bucket{route="hello",status="2xx",le="1.0"}'], 2)
+        self.assertEqual(values['sanic_adaptor_request_duration_seconds_bucket{route="hello",status="4xx",le="1.0"}'], 0)
+        self.assertEqual(values['sanic_adaptor_request_duration_seconds_bucket{route="hello",status="4xx",le="+Inf"}'], 1)
+        self.assertAlmostEqual(values['sanic_adaptor_request_duration_seconds_sum{route="hello",status="2xx"}'], 0.55)
+
+    def test_route_overflow_and_escaping(self):
+        metrics = Metrics(max_routes=3, max_workers=1)
+        for route in ('a', 'b"\\', 'c', 'd'):
+            metrics.request_started()
+            metrics.request_finished(route, 200, 0.01, 1)
+        values = samples(metrics.render())
+        self.assertIn('sanic_adaptor_requests_total{route="b\\"\\\\",status="2xx"}', values)
+        # <other> takes the first slot, so only two routes fit.
+        self.assertEqual(values['sanic_adaptor_requests_total{route="<other>",status="2xx"}'], 2)
+
+    def test_aggregates_across_forked_workers(self):
+        metrics = Metrics(max_routes=8, max_workers=4)
+        children = []
+        for worker in range(3):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    for _ in range(worker + 1):
+                        metrics.request_started()
+                        metrics.request_finished('hello', 200, 0.01, 100)
+                    metrics.request_started()
+                    metrics.request_finished('worker{:d}'.format(worker), 500, 0.01, 1)
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        for pid in children:
+            os.waitpid(pid, 0)
+        values = samples(metrics.render())
+        self.assertEqual(values['sanic_adaptor_requests_total{route="hello",status="2xx"}'], 6)
+        self.assertEqual(values['sanic_adaptor_response_size_bytes_total{route="hello",status="2xx"}'], 600)
+        for worker in range(3):
+            self.assertEqual(values['sanic_adaptor_requests_total{{route="worker{:d}",status="5xx"}}'.format(worker)], 1)
+        self.assertEqual(values['sanic_adaptor_requests_in_flight'], 0)
+
+    def test_dead_worker_slot_is_reused(self):
+        metrics = Metrics(max_routes=4, max_workers=1)
+        for _ in range(2):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    metrics.request_started()
+                    metrics.request_finished('hello', 200, 0.01, 1)
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+        self.assertEqual(samples(metrics.render())['sanic_adaptor_requests_total{route="hello",status="2xx"}'], 2)
+
+
+class HandlerMetricsTests(AdaptorTestCase):
+
+    def total(self, name, route, status):
+        return samples(self.handler.metrics.render()).get(
+            '{:s}{{route="{:s}",status="{:s}"}}'.format(name, route, status), 0)
+
+    def test_recorded_by_url_name(self):
+        before = self.total('sanic_adaptor_requests_total', 'hello', '2xx')
+        self.run_async(self.client.get('/hello/'))
+        self.assertEqual(self.total('sanic_adaptor_requests_total', 'hello', '2xx'), before + 1)
+
+    def test_streamed_size(self):
+        before = self.total('sanic_adaptor_response_size_bytes_total', 'stream', '2xx')
+        response = self.run_async(self.client.get('/stream/'))
+        self.assertEqual(self.total('sanic_adaptor_response_size_bytes_total', 'stream', '2xx'),
+                         before + len(response.body))
+
+    def test_metrics_route(self):
+        response = self.run_async(self.client.get('/metrics'))
+        self.assertEqual(response.status, 200)
+        self.assertIn('sanic_adaptor_requests_in_flight', response.text)
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django_sanic_adaptor.recorder import REDACTED_VALUE, TrafficRecorder, load_traffic
+from django_sanic_adaptor.testing import make_sanic_request
+from tests.base import AdaptorTestCase
+
+
+class TrafficRecorderTests(AdaptorTestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='django-sanic-adaptor-traffic-')
+        self.path = os.path.join(self.dir, 'traffic-{pid}.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def request(self, method, path, headers=None, body=b''):
+        return make_sanic_request(self.client.app, method, path, headers, body)
+
+    def test_record_and_load(self):
+        recorder = TrafficRecorder(self.path, flush_every=2)
+        recorder.record(self.request('GET', '/hello/?name=a', {'Host': 'testserver', 'Cookie': 'sessionid=secret'}))
+        recorder.record(self.request('POST', '/hello/', {'Authorization': 'Bearer secret'}, b'{"a": 1}'))
+        recorder.record(self.request('GET', '/async/'))
+        recorder.close()
+        records = load_traffic(self.path.format(pid=os.getpid()))
+        self.assertEqual([(r['m'], r['p'], r['b']) for r in records],
+                         [('GET', '/hello/?name=a', 0), ('POST', '/hello/', 8), ('GET', '/async/', 0)])
+        self.assertEqual(records[0]['h'], {'host': 'testserver', 'cookie': REDACTED_VALUE})
+        self.assertEqual(records[1]['h']['authorization'], REDACTED_VALUE)
+        self.assertNotIn('secret', json.dumps(records))
+
+    def test_buffered_until_flush(self):
+        recorder = TrafficRecorder(self.path, flush_every=10)
+        recorder.record(self.request('GET', '/hello/'))
+        self.assertFalse(os.path.exists(self.path.format(pid=os.getpid())))
+        recorder.flush()
+        self.assertEqual(len(load_traffic(self.path.format(pid=os.getpid()))), 1)
+        recorder.close()
+
+    def test_sampling(self):
+        recorder = TrafficRecorder(self.path, sample_rate=0.0)
+        for _ in range(10):
+            recorder.record(self.request('GET', '/hello/'))
+        recorder.close()
+        self.assertFalse(os.path.exists(self.path.format(pid=os.getpid())))
+
+    def test_not_importing_replay(self):
+        # The server records traffic, but has no use for the replay tool or the test client.
+        code = ('import sys, django_sanic_adaptor; '
+                'print(sorted(m for m in ("django_sanic_adaptor.loadtest", "django_sanic_adaptor.testing") if m in sys.modules))')
+        output = subprocess.check_output([sys.executable, '-c', code], env=dict(os.environ, PYTHONWARNINGS='ignore'))
+        self.assertEqual(output.strip(), b'[]')
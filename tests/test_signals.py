@@ -0,0 +1,94 @@
+import gc
+import weakref
+
+from django.core.signals import request_started
+from django.dispatch import Signal
+
+from django_sanic_adaptor.dispatch import SignalDispatcher
+
+from tests.base import AdaptorTestCase
+
+
+class SignalDispatchTests(AdaptorTestCase):
+
+    def test_receiver_swapped_between_requests(self):
+        calls = []
+
+        def first(**kwargs):
+            calls.append('first')
+
+        def second(**kwargs):
+            calls.append('second')
+
+        request_started.connect(first)
+        try:
+            self.run_async(self.client.get('/hello/'))
+        finally:
+            request_started.disconnect(first)
+        request_started.connect(second)
+        try:
+            self.run_async(self.client.get('/hello/'))
+        finally:
+            request_started.disconnect(second)
+        self.run_async(self.client.get('/hello/'))
+        self.assertEqual(calls, ['first', 'second'])
+
+    def test_async_receiver(self):
+        calls = []
+
+        async def receiver(**kwargs):
+            calls.append('async')
+
+        request_started.connect(receiver)
+        try:
+            self.run_async(self.client.get('/hello/'))
+            self.run_async(self.client.wait_for_background(1.0))
+        finally:
+            request_started.disconnect(receiver)
+        self.assertEqual(calls, ['async'])
+
+
+class Listener(object):
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def on_signal(self, **kwargs):
+        self.calls.append(kwargs['signal'])
+
+
+class SignalDispatcherTests(AdaptorTestCase):
+
+    def test_collected_receiver_stops_firing(self):
+        signal = Signal()
+        dispatcher = SignalDispatcher(self.handler.background)
+        calls = []
+        listener = Listener(calls)
+        signal.connect(listener.on_signal)
+        dispatcher.send(signal, None)
+        self.assertEqual(len(calls), 1)
+
+        collected = weakref.ref(listener)
+        del listener
+        gc.collect()
+        self.assertIsNone(collected())
+        dispatcher.send(signal, None)
+        self.assertEqual(len(calls), 1)
+
+    def test_strong_receiver(self):
+        signal = Signal()
+        dispatcher = SignalDispatcher(self.handler.background)
+        calls = []
+
+        def receiver(**kwargs):
+            calls.append(kwargs['sender'])
+
+        signal.connect(receiver, weak=False)
+        dispatcher.send(signal, 'sender')
+        signal.disconnect(receiver)
+        dispatcher.send(signal, 'sender')
+        self.assertEqual(calls, ['sender'])
+
+    def test_no_receivers(self):
+        dispatcher = SignalDispatcher(self.handler.background)
+        self.assertEqual(list(dispatcher.prime(Signal(), None)), [])
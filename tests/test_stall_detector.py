@@ -0,0 +1,88 @@
+import asyncio
+import time
+import traceback
+import unittest
+
+import django.middleware.common
+
+from django_sanic_adaptor.stall_detector import StallDetector
+
+
+class FakeMatch(object):
+
+    def __init__(self, view_name):
+        self.view_name = view_name
+        self.func = None
+
+
+class FakeRequest(object):
+
+    def __init__(self, path, view_name=None):
+        self.path = path
+        self.resolver_match = FakeMatch(view_name) if view_name else None
+
+
+class StallDetectorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.detector = StallDetector(threshold=0.1, middleware_modules=['django.middleware.common'])
+        self.detector._loop = self.loop
+
+    def tearDown(self):
+        self.detector.stop()
+        self.loop.close()
+
+    def middleware_stack(self):
+        stack = traceback.extract_stack()
+        stack.append(traceback.FrameSummary(django.middleware.common.__file__, 1, 'process_request'))
+        return stack
+
+    def record_in_request(self, request, stack, blocked):
+        async def _handle():
+            self.detector.enter(request)
+            try:
+                return self.detector._record(stack, blocked)
+            finally:
+                self.detector.exit()
+        return self.loop.run_until_complete(_handle())
+
+    def test_attributed_to_view_and_middleware(self):
+        record = self.record_in_request(FakeRequest('/users/', 'user_count'), self.middleware_stack(), 0.25)
+        self.assertEqual(record.view, 'user_count')
+        self.assertEqual(record.middleware, 'django.middleware.common')
+        self.assertEqual((record.count, record.total, record.worst), (1, 0.25, 0.25))
+
+    def test_unresolved_request(self):
+        record = self.record_in_request(FakeRequest('/missing/'), traceback.extract_stack(), 0.2)
+        self.assertEqual(record.view, 'unresolved /missing/')
+        self.assertIsNone(record.middleware)
+
+    def test_outside_a_request(self):
+        record = self.detector._record(traceback.extract_stack(), 0.2)
+        self.assertEqual(record.view, '<unknown>')
+
+    def test_report_aggregates_by_view(self):
+        request = FakeRequest('/users/', 'user_count')
+        self.record_in_request(request, self.middleware_stack(), 0.2)
+        self.record_in_request(request, self.middleware_stack(), 0.5)
+        self.record_in_request(FakeRequest('/hello/', 'hello'), traceback.extract_stack(), 0.3)
+        report = self.detector.report()
+        self.assertEqual([r.view for r in report], ['user_count', 'hello'])
+        self.assertEqual((report[0].count, report[0].worst), (2, 0.5))
+        self.assertAlmostEqual(report[0].total, 0.7)
+        self.assertIn('user_count (django.middleware.common)', self.detector.format_report())
+
+    def test_detects_blocked_loop(self):
+        async def _block():
+            await asyncio.sleep(0.05)
+            time.sleep(0.4)
+            await asyncio.sleep(0.05)
+
+        self.detector.start(self.loop)
+        with self.assertLogs('django_sanic_adaptor.stalls', 'WARNING'):
+            self.loop.run_until_complete(_block())
+        self.detector.stop()
+        report = self.detector.report()
+        self.assertEqual(len(report), 1)
+        self.assertGreaterEqual(report[0].worst, 0.1)
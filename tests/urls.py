@@ -0,0 +1,17 @@
+from django.urls import path
+
+from tests import views
+
+urlpatterns = [
+    path('hello/', views.hello, name='hello'),
+    path('async/', views.async_hello, name='async_hello'),
+    path('stream/', views.stream, name='stream'),
+    path('sleep/<int:ms>/', views.sleep, name='sleep'),
+    path('deadline/<int:ms>/', views.sleep, name='deadline'),
+    path('deadline/hang/', views.hang, name='hang'),
+    path('users/', views.user_count, name='user_count'),
+    path('fast/users/', views.fast_user_count, name='fast_user_count'),
+    path('background/<str:outcome>/', views.background, name='background'),
+    path('deadline/background/', views.background_timeout, name='background_timeout'),
+    path('prefix/users/', views.user_count, name='prefix_user_count'),
+]
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from django_sanic_adaptor import fast_path, run_after_response
+
+# Calls made by work the background views queued.
+BACKGROUND_CALLS = []
+
+
+def hello(request):
+    return HttpResponse('hello {:s}'.format(request.GET.get('name', 'world')))
+
+
+async def async_hello(request):
+    return JsonResponse({'async': True})
+
+
+def stream(request):
+    return StreamingHttpResponse(iter([b'first ', b'second']))
+
+
+async def sleep(request, ms):
+    await asyncio.sleep(ms / 1000.0)
+    return HttpResponse('slept {:d}ms'.format(ms))
+
+
+def hang(request):
+    time.sleep(1.0)
+    return HttpResponse('hung')
+
+
+def user_count(request):
+    return HttpResponse(str(User.objects.count()))
+
+
+@fast_path(middleware=['django.middleware.common.CommonMiddleware'])
+def fast_user_count(request):
+    return HttpResponse(str(User.objects.count()))
+
+
+def background(request, outcome):
+    run_after_response(request, BACKGROUND_CALLS.append, outcome)
+    if outcome == 'raise':
+        raise ValueError('The view failed after queueing work.')
+    if outcome == 'error':
+        return HttpResponse('failed', status=503)
+    return HttpResponse('queued')
+
+
+async def background_timeout(request):
+    run_after_response(request, BACKGROUND_CALLS.append, 'timeout')
+    await asyncio.sleep(2)
+    return HttpResponse('never')